@@ -0,0 +1,142 @@
+"""
+Compare the memory used by the slotted models with dict based equivalents.
+
+Usage:
+    python -m benchmarks.models [<champions>] [<items>]
+
+A population shaped like a full export (five abilities per champion, five
+levels per ability, several skins) is built twice: once with the models
+from loldb and once with copies of the same classes without __slots__.
+Sizes count the model instances and their attribute dicts, not the values
+they share.
+
+"""
+from __future__ import print_function
+
+import collections
+import sys
+
+from loldb.ability import Ability, AbilityLevel
+from loldb.champion import Champion, ChampionStats, Lore, Ratings
+from loldb.item import Item, ItemStats
+from loldb.skin import Skin
+
+MODEL_CLASSES = (
+    Champion,
+    ChampionStats,
+    Lore,
+    Ratings,
+    Ability,
+    AbilityLevel,
+    Skin,
+    Item,
+    ItemStats,
+)
+
+SKINS_PER_CHAMPION = 6
+
+
+def _unslotted(cls):
+    """Copy cls with its slots replaced by an instance dict."""
+    namespace = dict(
+        (key, value) for key, value in vars(cls).items()
+        if key not in cls.__slots__ and
+        key not in ('__slots__', '__dict__', '__weakref__')
+    )
+    return type(cls.__name__, (object,), namespace)
+
+
+def _make_champion(classes, id):
+    champion = classes['Champion']('Champion%d' % id)
+    champion.id = id
+    champion.name = champion.alias = champion.internal_name
+    champion.stats = classes['ChampionStats']()
+    champion.lore = classes['Lore']()
+    champion.ratings = classes['Ratings']()
+    for key in range(5):
+        ability = classes['Ability']()
+        ability.name = 'Ability%d' % key
+        for i in range(5):
+            level = classes['AbilityLevel']()
+            level.cooldown = level.cost = i
+            level.tooltip_values['@Effect1Amount@'] = i
+            ability.levels.append(level)
+        champion.abilities.append(ability)
+    for rank in range(SKINS_PER_CHAMPION):
+        skin = classes['Skin'](champion.internal_name)
+        skin.id = id * 1000 + rank
+        skin.champion_id = id
+        skin.rank = rank
+        champion.skins.append(skin)
+    return champion
+
+
+def _make_item(classes, id):
+    item = classes['Item']()
+    item.id = id
+    item.name = item.alias = 'Item%d' % id
+    item.stats = classes['ItemStats']()
+    return item
+
+
+def _iter_models(champions, items):
+    for champion in champions:
+        yield champion
+        yield champion.stats
+        yield champion.lore
+        yield champion.ratings
+        for ability in champion.abilities:
+            yield ability
+            for level in ability.levels:
+                yield level
+        for skin in champion.skins:
+            yield skin
+    for item in items:
+        yield item
+        yield item.stats
+
+
+def _get_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def measure(classes, champion_count, item_count):
+    """Return map of class name to (instance count, total bytes)."""
+    champions = [_make_champion(classes, id)
+                 for id in range(1, champion_count + 1)]
+    items = [_make_item(classes, id) for id in range(item_count)]
+    counts = collections.defaultdict(int)
+    sizes = collections.defaultdict(int)
+    for obj in _iter_models(champions, items):
+        name = type(obj).__name__
+        counts[name] += 1
+        sizes[name] += _get_size(obj)
+    return dict((name, (counts[name], sizes[name])) for name in counts)
+
+
+def main(champion_count=130, item_count=250):
+    slotted = dict((cls.__name__, cls) for cls in MODEL_CLASSES)
+    unslotted = dict((cls.__name__, _unslotted(cls)) for cls in MODEL_CLASSES)
+    old = measure(unslotted, champion_count, item_count)
+    new = measure(slotted, champion_count, item_count)
+
+    row = '{0:<14} {1:>8} {2:>12} {3:>12} {4:>7}'
+    print(row.format('class', 'count', 'dict bytes', 'slot bytes', 'saved'))
+    for cls in MODEL_CLASSES:
+        name = cls.__name__
+        count, old_size = old[name]
+        _, new_size = new[name]
+        print(row.format(name, count, old_size, new_size,
+                         '%d%%' % (100 - 100 * new_size // old_size)))
+    old_total = sum(size for _, size in old.values())
+    new_total = sum(size for _, size in new.values())
+    print(row.format('total', sum(count for count, _ in new.values()),
+                     old_total, new_total,
+                     '%d%%' % (100 - 100 * new_total // old_total)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
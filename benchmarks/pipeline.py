@@ -0,0 +1,407 @@
+"""
+Time and measure the memory of every stage of the pipeline in isolation.
+
+Usage:
+    pipeline [options] [<stage>...]
+
+Options:
+    -h --help               Show this screen.
+    --champions=<count>     Champions in the fixture [default: 100].
+    --items=<count>         Items in the fixture [default: 200].
+    --repeat=<count>        Runs of each stage [default: 5].
+    --timeout=<seconds>     Time allowed for a run of a stage
+                            [default: 600].
+    --baseline=<path>       Baseline results to compare with
+                            [default: benchmarks/baseline.json].
+    --threshold=<percent>   Allowed slowdown or memory growth of a stage
+                            over the baseline [default: 25].
+    --save                  Save the results as the new baseline.
+
+Run with python -m benchmarks.pipeline. Stages default to all of them:
+rows, raf_lookup, inibin_parse, ability_from_inibin, correct_champions,
+validate_champions, format_champion, write_json, write_ndjson and
+write_yaml. The writers write to os.devnull.
+
+A fixture install is generated in a temporary directory. Every run of a
+stage is a new process, and its inputs are prepared before it is timed.
+The fastest time and the smallest memory of the runs are reported.
+Memory is the tracemalloc peak of the stage when tracemalloc is
+available (Python 3). Otherwise it is how far the stage grew the peak
+resident set size past the peak of preparing its inputs, or unknown
+where the resource module is missing (Windows). Unknown memory is never
+a regression.
+
+Exits with status 1 if a stage regressed past the threshold.
+
+"""
+from __future__ import print_function
+
+import contextlib
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+from docopt import docopt
+from inibin import Inibin
+
+from loldb import champion, convert, fixture, item, provider
+from loldb.ability import Ability
+from loldb.correct import correct_champions
+from loldb.validate import validate_champions
+
+try:
+    from queue import Empty
+except ImportError:
+    from Queue import Empty
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Results below these are noise, they never count as regressions
+MIN_SECONDS = 0.001
+MIN_MEMORY = 64 * 1024
+
+
+class _Context(object):
+    """Inputs of the stages, each prepared once per process."""
+
+    def __init__(self, path):
+        self.provider = provider.LinuxResourceProvider(path)
+        self._champions = None
+        self._ability_maps = None
+
+    def get_paths(self):
+        """Get the path of every champion and ability inibin."""
+        paths = []
+        for row in champion.get_champion_rows(self.provider):
+            champion_map = champion._find_inibin(
+                self.provider,
+                [champion._CHAMPION_PATH_TEMPLATE.format(row.name)],
+                'champion',
+            )
+            names = [champion_map['abilities'][key]
+                     for key in champion._ABILITY_KEYS]
+            paths.extend(
+                path for path in champion.get_inibin_paths(row.name, names)
+                if path in self.provider.get_raf_index()
+            )
+        return paths
+
+    def get_inibins(self):
+        """Get (kind, data) of every champion and ability inibin."""
+        raf_index = self.provider.get_raf_index()
+        return [
+            ('ability' if '/spells/' in path else 'champion',
+             raf_index.find(path).read())
+            for path in self.get_paths()
+        ]
+
+    def get_ability_maps(self):
+        """Get (ability map, ability index) of every ability."""
+        if self._ability_maps is None:
+            self._ability_maps = []
+            for path in self.get_paths():
+                if '/spells/' not in path:
+                    index = 0
+                    continue
+                self._ability_maps.append((
+                    champion._find_inibin(self.provider, [path], 'ability'),
+                    index,
+                ))
+                index += 1
+        return self._ability_maps
+
+    def get_champions(self):
+        """Extract new Champions, they are modified by some stages."""
+        return list(champion.get_champions(self.provider))
+
+    def get_corrected_champions(self):
+        if self._champions is None:
+            self._champions = self.get_champions()
+            correct_champions(self._champions)
+        return self._champions
+
+    def get_records(self):
+        """Get formatted champions and items."""
+        champions = [convert.format_champion(c)
+                     for c in self.get_corrected_champions()]
+        items = dict((id, convert.format_item(i)) for id, i in
+                     item.get_items(self.provider).items())
+        return champions, items
+
+
+def _setup_rows(context):
+    def run():
+        for table in ('champions', 'championSkins', 'items',
+                      'itemCategories', 'itemRecipes'):
+            for _ in context.provider.get_db_rows(table):
+                pass
+    return run
+
+
+def _setup_raf_lookup(context):
+    paths = context.get_paths()
+    raf_index = context.provider.get_raf_index()
+
+    def run():
+        for path in paths:
+            raf_index.find(path).read()
+    return run
+
+
+def _setup_inibin_parse(context):
+    inibins = context.get_inibins()
+    font_config = context.provider.get_font_config()
+
+    def run():
+        for kind, data in inibins:
+            inibin = Inibin(data=data)
+            champion._INIBIN_KINDS[kind](inibin, font_config)
+    return run
+
+
+def _setup_ability_from_inibin(context):
+    ability_maps = context.get_ability_maps()
+
+    def run():
+        for ability_map, index in ability_maps:
+            Ability.from_inibin(ability_map, index)
+    return run
+
+
+def _setup_correct_champions(context):
+    champions = context.get_champions()
+    return lambda: correct_champions(champions)
+
+
+def _setup_validate_champions(context):
+    champions = context.get_corrected_champions()
+    return lambda: list(validate_champions(champions))
+
+
+def _setup_format_champion(context):
+    champions = context.get_corrected_champions()
+    return lambda: [convert.format_champion(c) for c in champions]
+
+
+def _setup_writer(context, write):
+    """Set up a stage that writes the records to os.devnull."""
+    champions, items = context.get_records()
+
+    def run():
+        with open(os.devnull, 'w') as f:
+            write(f, champions, items)
+    return run
+
+
+def _setup_write_json(context):
+    return _setup_writer(context, convert.write_json)
+
+
+def _setup_write_ndjson(context):
+    return _setup_writer(context, convert.write_ndjson)
+
+
+def _setup_write_yaml(context):
+    return _setup_writer(context, convert.write_yaml)
+
+
+STAGES = (
+    ('rows', _setup_rows),
+    ('raf_lookup', _setup_raf_lookup),
+    ('inibin_parse', _setup_inibin_parse),
+    ('ability_from_inibin', _setup_ability_from_inibin),
+    ('correct_champions', _setup_correct_champions),
+    ('validate_champions', _setup_validate_champions),
+    ('format_champion', _setup_format_champion),
+    ('write_json', _setup_write_json),
+    ('write_ndjson', _setup_write_ndjson),
+    ('write_yaml', _setup_write_yaml),
+)
+
+
+def _get_max_rss():
+    """Get the maximum resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, OS X bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _measure(run):
+    """Call run, returns (seconds, peak memory in bytes or None)."""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+    else:
+        # Includes the imports and the inputs, only growth past it counts
+        start_rss = _get_max_rss()
+    start = time.time()
+    run()
+    seconds = time.time() - start
+    if tracemalloc is not None:
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    elif start_rss is not None:
+        memory = _get_max_rss() - start_rss
+    else:
+        memory = None
+    return seconds, memory
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Hide the output of the raf library and data warnings."""
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        sys.stdout = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def _run_stage(queue, path, setup):
+    try:
+        with _quiet():
+            queue.put(_measure(setup(_Context(path))))
+    except Exception as e:
+        queue.put(e)
+
+
+def _get_result(queue, process, timeout):
+    """Get the result of a process, which must not die or time out."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            pass
+        if process.exitcode is not None:
+            # It may have exited just after the result was sent
+            try:
+                return queue.get(timeout=1)
+            except Empty:
+                raise RuntimeError('Stage process exited with code %s' %
+                                   process.exitcode)
+        if time.time() > deadline:
+            process.terminate()
+            raise RuntimeError('Stage did not finish in %s seconds' %
+                               timeout)
+
+
+def run_stage(path, setup, repeat, timeout):
+    """
+    Run a stage repeat times against the install at path, each time in a
+    new process so that peak memory is measured from a fresh start.
+
+    Returns the smallest (seconds, memory) of the runs, memory is None if
+    it cannot be measured. Raises RuntimeError if a run dies or takes
+    longer than timeout seconds.
+
+    """
+    results = []
+    for _ in range(repeat):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_run_stage,
+                                          args=(queue, path, setup))
+        process.start()
+        try:
+            result = _get_result(queue, process, timeout)
+        finally:
+            process.join()
+        if isinstance(result, Exception):
+            raise result
+        results.append(result)
+    memory = [m for _, m in results if m is not None]
+    return min(s for s, _ in results), min(memory) if memory else None
+
+
+def get_regressions(results, baseline, threshold):
+    """
+    Generate messages for stages slower or larger than their baseline.
+
+    results and baseline map stage names to {'seconds', 'memory'}.
+    threshold is the allowed growth as a fraction. Values that are None,
+    or missing from the baseline, are not compared.
+
+    """
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for key, minimum in (('seconds', MIN_SECONDS),
+                             ('memory', MIN_MEMORY)):
+            old, new = baseline[name].get(key), result[key]
+            if old is None or new is None:
+                continue
+            if new > max(old * (1 + threshold), old + minimum):
+                yield '%s %s regressed from %s to %s' % (name, key, old, new)
+
+
+def main():
+    args = docopt(__doc__)
+    stages = args['<stage>'] or [name for name, _ in STAGES]
+    setups = dict(STAGES)
+    for name in stages:
+        if name not in setups:
+            print('Unknown stage "%s", expected one of: %s' %
+                  (name, ', '.join(name for name, _ in STAGES)))
+            exit(1)
+
+    path = tempfile.mkdtemp()
+    try:
+        fixture.write_fixture(path, champions=int(args['--champions']),
+                              items=int(args['--items']))
+        results = {}
+        row = '{0:<20} {1:>10} {2:>12}'
+        print(row.format('stage', 'ms', 'memory KiB'))
+        for name in stages:
+            seconds, memory = run_stage(path, setups[name],
+                                        int(args['--repeat']),
+                                        float(args['--timeout']))
+            results[name] = {'seconds': seconds, 'memory': memory}
+            print(row.format(name, '%.1f' % (seconds * 1000),
+                             '-' if memory is None else memory // 1024))
+    finally:
+        shutil.rmtree(path)
+
+    baseline_path = args['--baseline']
+    if args['--save']:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2, separators=(',', ': '),
+                      sort_keys=True)
+            f.write('\n')
+        print('Saved baseline to "%s"' % baseline_path)
+        return
+
+    if not os.path.exists(baseline_path):
+        print('No baseline at "%s", use --save to create it' %
+              baseline_path)
+        return
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    threshold = float(args['--threshold']) / 100
+    regressions = list(get_regressions(results, baseline, threshold))
+    for message in regressions:
+        print(message)
+    if regressions:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,20 @@
 import ability
+import binary
+import cache
 import champion
 import convert
 import correct
+import fixture
+import incremental
+import index
 import item
+import memory
+import metrics
 import provider
+import recipe
 import skin
+import sqlite
+import tooltip
 import util
 import validate
 
@@ -1,16 +1,29 @@
 """
 Usage:
   loldb stats [options]
+  loldb query <export> [options]
+  loldb fixture <path> [options]
   loldb --help
   loldb --version
 
 Options:
   -p, --path=<path>     Location of LoL installation.
-  -o, --os=<system>     Operating system. Either 'mac' or 'win', if absent
-                        attempts to auto-detect.
+  -o, --os=<system>     Operating system. Either 'mac', 'win' or 'linux', if
+                        absent attempts to auto-detect. On Linux the
+                        installation has the Windows layout.
 
   -j, --json=<path>     Location to write json representation to.
   -y, --yaml=<path>     Location to write yaml representation to.
+  --ndjson=<path>       Location to write newline-delimited json to, one
+                        record per line. Champions are written as soon as
+                        they are extracted.
+  --binary=<path>       Location to write a random access binary file to,
+                        see loldb.binary.
+  --sqlite=<path>       Location to write an indexed sqlite database to.
+  --npz=<path>          Location to write a NumPy table of champion base
+                        and per level stats to. Requires NumPy.
+  --npz-levels          Include every stat at levels 1 to 18 in the --npz
+                        table.
 
   -f, --force           Continue automatically on warnings.
   -n, --no              Abort automatically on warnings.
@@ -20,27 +33,81 @@ Options:
 
   --lang=<language>     Language to output [default: en_US].
 
+  --jobs=<count>        Number of processes to extract champions with
+                        [default: 1].
+  --read-only           Open gameStats read-only and immutable, so a
+                        running client is never locked.
+  --snapshot            Copy gameStats into memory once, implies
+                        --read-only.
+  --cache=<path>        Directory to cache parsed inibins in.
+  --cache-size=<mb>     Maximum size of the inibin cache in megabytes
+                        [default: 256].
+
+  --champion=<filter>   Only extract or query champions matching a
+                        comma-separated list of ids, internal names,
+                        aliases or tags.
+  --item=<filter>       Only extract or query items matching a
+                        comma-separated list of ids, names, aliases or
+                        categories.
+  --prefix=<prefix>     Query champions and items with names starting with
+                        prefix.
+  --skin=<id>           Query the champion with a skin id.
+  --merge=<path>        Location of json output of a previous run to merge
+                        the extracted champions and items into.
+
+  --manifest=<path>     Location of the manifest of the previous run. Only
+                        champions and items that changed since then are
+                        rebuilt, then the manifest is updated.
+  --delta=<path>        Location to write json of changed records to.
+                        Requires --manifest.
+
+  --profile             Print the time of each stage of the run and counts
+                        of the work done.
+  --profile-json=<path>  Location to write the --profile results to as
+                        json.
+  --profile-memory      Record the peak memory and top allocation sites of
+                        each stage, and the model instances it leaves
+                        alive, to memory_profile.json next to the outputs.
+                        Slow.
+
+  --champions=<count>   Number of champions in a fixture [default: 100].
+  --items=<count>       Number of items in a fixture [default: 200].
+  --skins=<count>       Number of skins per champion in a fixture
+                        [default: 5].
+  --seed=<seed>         Seed of the values in a fixture [default: 0].
+
   -h, --help            Display this message.
   --version             Display version number.
 
 """
+import json
 import os
 import sys
 
 import docopt
 
-from . import __version__
+from . import __version__, metrics
+from .binary import write_binary
 from .champion import get_champions
 from .convert import (
     format_champion,
     format_item,
-    to_json,
-    to_yaml,
+    merge_records,
+    read_json,
+    to_ndjson_line,
+    write_json,
+    write_ndjson,
+    write_yaml,
 )
-from .correct import correct_champions
+from .correct import correct_champion
+from .fixture import write_fixture
+from .incremental import IncrementalBuild, Manifest, to_json_delta
+from .index import ExportIndex
 from .item import get_items
 from .provider import get_provider_class
-from .validate import validate_champions
+from .recipe import get_recipe_graph
+from .sqlite import write_sqlite
+from .validate import validate_champion
 
 
 if sys.version[0] == '3':
@@ -48,6 +115,12 @@ if sys.version[0] == '3':
 
 
 def main(args):
+    if args['query']:
+        query(args)
+        return
+    if args['fixture']:
+        fixture(args)
+        return
     if not args['stats']:
         return
 
@@ -56,9 +129,19 @@ def main(args):
 
     path = args['--path']
 
+    try:
+        cache_size = int(args['--cache-size']) * 1024 * 1024
+    except ValueError:
+        print('Invalid cache size "%s"' % args['--cache-size'])
+        exit(1)
+
     provider = ResourceProviderCls(
         lol_path=path,
-        language=args['--lang']
+        language=args['--lang'],
+        cache_path=args['--cache'],
+        cache_size=cache_size,
+        read_only=args['--read-only'],
+        snapshot=args['--snapshot'],
     )
 
     if path is None:
@@ -73,39 +156,345 @@ def main(args):
         print('Not a valid LoL installation, path should contain RADS folder.')
         exit(1)
 
-    if not args['--json'] and not args['--yaml']:
+    try:
+        jobs = int(args['--jobs'])
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        print('Invalid job count "%s"' % args['--jobs'])
+        exit(1)
+
+    manifest_path = args['--manifest']
+    if args['--delta'] and not manifest_path:
+        print('--delta requires --manifest.')
+        exit(1)
+
+    champion_filters = parse_filter(args['--champion'])
+    item_filters = parse_filter(args['--item'])
+    if manifest_path and (champion_filters or item_filters):
+        print('--champion and --item cannot be used with --manifest.')
+        exit(1)
+    merge_path = args['--merge']
+
+    npz_path = args['--npz']
+    if npz_path:
+        # Importing loldb.table loads NumPy, which only --npz needs
+        from . import table
+        if not table.AVAILABLE:
+            print('--npz requires NumPy.')
+            exit(1)
+
+    if not any(args[option] for option in
+               ('--json', '--yaml', '--ndjson', '--binary', '--sqlite',
+                '--npz')):
         ask_about_warning('No output files specified, continue?', args)
 
-    champions = list(get_champions(provider))
+    recorder = None
+    memory = None
+    if args['--profile-memory']:
+        # The path is implicit, so ask before a run rather than after it
+        memory_path = get_memory_profile_path(args)
+        if os.path.exists(memory_path):
+            ask_about_warning(
+                'Memory profile "%s" already exists, overwrite?' % memory_path,
+                args,
+            )
+        from .memory import MemoryRecorder
+        memory = MemoryRecorder()
+    if args['--profile'] or args['--profile-json'] or memory is not None:
+        recorder = metrics.enable(memory=memory)
+
+    try:
+        build = None
+        if manifest_path:
+            previous = None
+            if os.path.exists(manifest_path):
+                previous = Manifest.load(manifest_path)
+            build = IncrementalBuild(provider, __version__, previous,
+                                     args['--skip-corrections'])
+            champions = build.get_champions(jobs=jobs)
+        else:
+            champions = get_champions(
+                provider,
+                jobs=jobs,
+                filters=champion_filters
+            )
+        champions = metrics.iter_stage('extract_champions', champions)
+
+        # Full builds stream records to ndjson as soon as they are formatted
+        ndjson_path = args['--ndjson']
+        ndjson_file = None
+        if ndjson_path and build is None and not merge_path:
+            prepare_write_path(ndjson_path)
+            ndjson_file = open(ndjson_path, 'w')
+
+        try:
+            champions = process_champions(champions, args, build, ndjson_file)
+
+            with metrics.stage('extract_items'):
+                items = get_items(provider, item_filters)
+                recipe_graph = get_recipe_graph(provider)
+            with metrics.stage('format_items'):
+                items = dict((key, format_item(item, recipe_graph))
+                             for key, item in items.items())
+
+            if ndjson_file is not None:
+                with metrics.stage('write_ndjson'):
+                    write_ndjson(ndjson_file, [], items)
+        finally:
+            if ndjson_file is not None:
+                ndjson_file.close()
+        if ndjson_file is not None:
+            metrics.count_file_size('bytes_written_ndjson', ndjson_path)
+            print('Wrote ndjson to "%s"' % ndjson_path)
+        if memory is not None:
+            memory.count_objects('formatted')
+
+        if build is not None:
+            with metrics.stage('update_manifest'):
+                build.add_items(items)
+                champions = build.manifest.get_champion_records()
+                items = build.manifest.get_item_records()
+
+            delta_path = args['--delta']
+            if delta_path:
+                prepare_write_path(delta_path)
+                with metrics.stage('write_delta'), open(delta_path, 'w') as f:
+                    f.write(to_json_delta(build.get_delta()))
+                metrics.count_file_size('bytes_written_delta', delta_path)
+                print('Wrote delta to "%s"' % delta_path)
+
+            prepare_write_path(manifest_path)
+            with metrics.stage('write_manifest'):
+                build.manifest.save(manifest_path)
+            metrics.count_file_size('bytes_written_manifest', manifest_path)
+            print('Wrote manifest to "%s"' % manifest_path)
+
+        if merge_path:
+            with metrics.stage('merge'):
+                with open(merge_path) as f:
+                    existing_champions, existing_items = read_json(f)
+                champions, items = merge_records(
+                    existing_champions,
+                    existing_items,
+                    champions,
+                    items,
+                )
+            print('Merged into "%s"' % merge_path)
+
+        if ndjson_path and ndjson_file is None:
+            prepare_write_path(ndjson_path)
+            with metrics.stage('write_ndjson'), open(ndjson_path, 'w') as f:
+                write_ndjson(f, champions, items)
+            metrics.count_file_size('bytes_written_ndjson', ndjson_path)
+            print('Wrote ndjson to "%s"' % ndjson_path)
+
+        json_path = args['--json']
+        if json_path:
+            prepare_write_path(json_path)
+            with metrics.stage('write_json'), open(json_path, 'w') as f:
+                write_json(f, champions, items)
+            metrics.count_file_size('bytes_written_json', json_path)
+            print('Wrote json to "%s"' % json_path)
+
+        yaml_path = args['--yaml']
+        if yaml_path:
+            prepare_write_path(yaml_path)
+            with metrics.stage('write_yaml'), open(yaml_path, 'w') as f:
+                write_yaml(f, champions, items)
+            metrics.count_file_size('bytes_written_yaml', yaml_path)
+            print('Wrote yaml to "%s"' % yaml_path)
+
+        binary_path = args['--binary']
+        if binary_path:
+            prepare_write_path(binary_path)
+            with metrics.stage('write_binary'), open(binary_path, 'wb') as f:
+                write_binary(f, champions, items)
+            metrics.count_file_size('bytes_written_binary', binary_path)
+            print('Wrote binary to "%s"' % binary_path)
+
+        sqlite_path = args['--sqlite']
+        if sqlite_path:
+            prepare_write_path(sqlite_path)
+            with metrics.stage('write_sqlite'):
+                write_sqlite(sqlite_path, champions, items)
+            metrics.count_file_size('bytes_written_sqlite', sqlite_path)
+            print('Wrote sqlite to "%s"' % sqlite_path)
+
+        if npz_path:
+            prepare_write_path(npz_path)
+            with metrics.stage('write_npz'), open(npz_path, 'wb') as f:
+                table.ChampionStatTable.from_records(champions).save(
+                    f,
+                    include_levels=args['--npz-levels'],
+                )
+            metrics.count_file_size('bytes_written_npz', npz_path)
+            print('Wrote npz to "%s"' % npz_path)
+
+        if memory is not None:
+            memory.count_objects('written')
+    finally:
+        # Stop recording even when a stage fails or the user aborts
+        if recorder is not None:
+            metrics.disable()
+
+    if recorder is not None:
+        write_profile(recorder, args)
+
+
+def query(args):
+    """
+    Look up champions and items in the json output of a previous run.
+
+    Matching records are written to stdout as newline-delimited json.
+    """
+    champion_filters = parse_filter(args['--champion'])
+    item_filters = parse_filter(args['--item'])
+    prefix = args['--prefix']
+    skin_id = args['--skin']
+    if not (champion_filters or item_filters or prefix or skin_id):
+        print('Nothing to query, use --champion, --item, --prefix or --skin.')
+        exit(1)
+    if skin_id is not None and not skin_id.isdigit():
+        print('Invalid skin id "%s"' % skin_id)
+        exit(1)
+
+    export_path = args['<export>']
+    if not os.path.isfile(export_path):
+        print('Invalid export "%s"' % export_path)
+        exit(1)
+    with open(export_path) as f:
+        index = ExportIndex(*read_json(f))
+
+    champions = []
+    items = []
+    for term in champion_filters:
+        champions.extend(index.find_champions(term))
+    for term in item_filters:
+        items.extend(index.find_items(term))
+    if prefix:
+        champions.extend(index.find_champions_by_prefix(prefix))
+        items.extend(index.find_items_by_prefix(prefix))
+    if skin_id is not None:
+        champion = index.get_champion_by_skin(int(skin_id))
+        if champion is not None:
+            champions.append(champion)
+
+    champions = dict((record['id'], record) for record in champions)
+    items = dict((record['id'], record) for record in items)
+    write_ndjson(
+        sys.stdout,
+        [champions[id] for id in sorted(champions)],
+        sorted(items.items()),
+    )
 
-    if not args['--skip-corrections']:
-        correct_champions(champions)
+
+def fixture(args):
+    """
+    Write a synthetic installation, see loldb.fixture.
+
+    It can be read with --os=linux and --path set to the same path.
+    """
+    counts = {}
+    for option in ('--champions', '--items', '--skins', '--seed'):
+        try:
+            counts[option] = int(args[option])
+        except ValueError:
+            print('Invalid %s "%s"' % (option[2:], args[option]))
+            exit(1)
+
+    path = args['<path>']
+    if os.path.exists(os.path.join(path, 'RADS')):
+        print('Path "%s" already contains an installation' % path)
+        exit(1)
+    write_fixture(
+        path,
+        champions=counts['--champions'],
+        items=counts['--items'],
+        skins=counts['--skins'],
+        seed=counts['--seed'],
+        language=args['--lang'],
+    )
+    print('Wrote fixture to "%s"' % path)
+
+
+def process_champions(champions, args, build=None, ndjson_file=None):
+    """
+    Correct, validate and format champions one at a time.
+
+    Formatted champions are added to build and written to ndjson_file as
+    they are ready. Validation errors are printed as they are found, and
+    the user is asked whether to continue once every champion is done.
+
+    Returns list of formatted champions.
+    """
+    validation_errors = []
+    formatted_champions = []
+    for champion in champions:
+        if not args['--skip-corrections']:
+            with metrics.stage('correct_champions'):
+                correct_champion(champion)
+
+        if not args['--skip-validation']:
+            with metrics.stage('validate_champions'):
+                errors = list(validate_champion(champion))
+            for error in errors:
+                print(error)
+                validation_errors.append(error)
+
+        with metrics.stage('format_champions'):
+            formatted_champion = format_champion(champion)
+        if build is not None:
+            build.add_champion(champion, formatted_champion)
+        if ndjson_file is not None:
+            with metrics.stage('write_ndjson'):
+                ndjson_file.write(
+                    to_ndjson_line('champion', formatted_champion)
+                )
+                ndjson_file.flush()
+        formatted_champions.append(formatted_champion)
+
+    if build is not None:
+        print('Rebuilt %d changed champions.' % len(formatted_champions))
 
     if not args['--skip-validation']:
-        validation_errors = list(validate_champions(champions))
-        print('\n'.join(validation_errors))
+        # An incremental build may have no changed champions
+        if not formatted_champions and build is None:
+            validation_errors.append('No champions!')
+            print(validation_errors[-1])
         print('%d validation errors.' % len(validation_errors))
         if validation_errors:
             ask_about_warning('Validation errors encountered, continue?', args)
 
-    champions = [format_champion(champion) for champion in champions]
-
-    items = get_items(provider)
-    items = dict((key, format_item(item)) for key, item in items.items())
-
-    json_path = args['--json']
-    if json_path:
-        prepare_write_path(json_path)
-        with open(json_path, 'w') as f:
-            f.write(to_json(champions, items))
-        print('Wrote json to "%s"' % json_path)
-
-    yaml_path = args['--yaml']
-    if yaml_path:
-        prepare_write_path(yaml_path)
-        with open(yaml_path, 'w') as f:
-            f.write(to_yaml(champions, items))
-        print('Wrote yaml to "%s"' % yaml_path)
+    return formatted_champions
+
+
+def write_profile(recorder, args):
+    """Print the results of metrics recorder and write them as json."""
+    if args['--profile']:
+        print(recorder.format_table())
+    profile_path = args['--profile-json']
+    if profile_path:
+        prepare_write_path(profile_path)
+        with open(profile_path, 'w') as f:
+            json.dump(recorder.to_dict(), f, indent=2)
+        print('Wrote profile to "%s"' % profile_path)
+    if recorder.memory is not None:
+        memory_path = get_memory_profile_path(args)
+        prepare_write_path(memory_path)
+        with open(memory_path, 'w') as f:
+            json.dump(recorder.memory.to_dict(), f, indent=2)
+        print('Wrote memory profile to "%s"' % memory_path)
+
+
+def get_memory_profile_path(args):
+    """Get the path of memory_profile.json, next to the first output."""
+    for option in ('--json', '--yaml', '--ndjson', '--binary', '--sqlite',
+                   '--npz'):
+        if args[option]:
+            directory = os.path.dirname(args[option])
+            return os.path.join(directory, 'memory_profile.json')
+    return 'memory_profile.json'
 
 
 def ask_about_warning(warning, args):
@@ -138,6 +527,14 @@ def ask_yes_no():
         print('Answer Y/N')
 
 
+def parse_filter(value):
+    """Split a comma-separated filter option into a list of terms."""
+    if not value:
+        return []
+    terms = (term.strip() for term in value.split(','))
+    return [term for term in terms if term]
+
+
 def prepare_write_path(path):
     """
     Create missing directories such that path may be opened.
@@ -1,13 +1,13 @@
-from bs4 import BeautifulSoup as Soup
+from .tooltip import TooltipTemplate, get_tag_text
 
-class AbilityLevel(object):
-    tooltip_values = {}
 
-    cooldown = -1
-    cost = -1
+class AbilityLevel(object):
+    __slots__ = ('tooltip_values', 'cooldown', 'cost')
 
     def __init__(self):
         self.tooltip_values = {}
+        self.cooldown = -1
+        self.cost = -1
 
     def set_tooltip_value(self, key, value, tooltip=None):
         """
@@ -36,40 +36,59 @@ class AbilityLevel(object):
 
 
 class Ability(object):
-    name = ''
-    internal_name = ''
-    description = ''
-    key = ''
-    tooltip = ''
-    icon_path = ''
-
-    _inibin = None
-
-    levels = []
+    __slots__ = (
+        'name',
+        'internal_name',
+        'description',
+        'key',
+        'tooltip',
+        'icon_path',
+        'levels',
+        '_inibin',
+        '_tooltip_template',
+    )
 
     def __init__(self):
+        self.name = ''
+        self.internal_name = ''
+        self.description = ''
+        self.key = ''
+        self.tooltip = ''
+        self.icon_path = ''
         self.levels = []
+        self._inibin = None
+        self._tooltip_template = None
 
     def __repr__(self):
         return '<Ability \'{}\'>'.format(self.name)
 
+    def get_tooltip_template(self):
+        """Get TooltipTemplate for the tooltip, compiled once."""
+        template = self._tooltip_template
+        if template is None or template.text != self.tooltip:
+            template = self._tooltip_template = TooltipTemplate(self.tooltip)
+        return template
+
     def get_tooltip_for_level(self, level):
         level = self.levels[level]
-        tooltip = self.tooltip
-        for key, value in level.tooltip_values.items():
-            tooltip = tooltip.replace(key, str(value))
-        return tooltip
+        return self.get_tooltip_template().render(level.tooltip_values)
+
+    def get_tooltips(self):
+        """Get the tooltip for every level."""
+        return self.get_tooltip_template().render_all(
+            level.tooltip_values for level in self.levels
+        )
+
+    def get_missing_tooltip_keys(self):
+        """Get a list of the set of tooltip keys missing a value, per level."""
+        template = self.get_tooltip_template()
+        return [template.get_missing_keys(level.tooltip_values)
+                for level in self.levels]
 
     @staticmethod
     def format_tooltip(tooltip):
         """Convert tooltip html to text."""
-        tooltip = tooltip.replace('<br>', '\n')
-        tooltip = Soup(tooltip)
-        maintext = tooltip.maintext
-        if maintext is None:
-            return None
-        else:
-            return maintext.text
+        return get_tag_text(tooltip, 'maintext')
 
     KEYS = 'QWER'
     # TODO: Level 6 support
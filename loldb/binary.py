@@ -0,0 +1,372 @@
+"""
+Random access binary export of formatted champions, items and skins.
+
+Layout, all little-endian:
+    header
+    string index: (offset, length) of every utf-8 string
+    string data
+    champion table: (id, offset) of every champion record, sorted by id
+    champion records
+    item table and records
+    skin table and records
+
+Records are fixed width. Numbers and the stat blocks are stored inline,
+strings as indexes into the string table. Fields without a fixed width
+(lists, lore, abilities...) are stored as one json string per record.
+Champion records refer to their skins by id.
+
+BinaryExport memory maps a file and decodes records on demand, so
+processes forked after opening it share its pages.
+
+"""
+import json
+import mmap
+import struct
+
+from .champion import ChampionStats
+from .convert import Encoder
+from .item import ItemStats
+
+MAGIC = b'LOLDBBIN'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHxx' + 'I' * 10)
+_STRING_INDEX = struct.Struct('<II')
+_TABLE_ENTRY = struct.Struct('<iI')
+
+# Missing values
+_NO_INT = -2 ** 31
+_NO_STRING = 2 ** 32 - 1
+
+# Struct code of each field kind
+_CODES = {'int': 'i', 'float': 'd', 'string': 'I'}
+
+
+def _get_stat_fields(stats):
+    return tuple(
+        (('stats', name, part), 'float')
+        for name in stats
+        for part in ('base', 'per_level')
+        if name not in ('range', 'speed')
+    ) + tuple((('stats', name), 'float')
+              for name in ('range', 'speed'))
+
+
+_CHAMPION_FIELDS = (
+    (('id',), 'int'),
+    (('internal_name',), 'string'),
+    (('name',), 'string'),
+    (('alias',), 'string'),
+    (('title',), 'string'),
+    (('icon_path',), 'string'),
+    (('select_sound_path',), 'string'),
+    (('ratings', 'attack'), 'int'),
+    (('ratings', 'defense'), 'int'),
+    (('ratings', 'magic'), 'int'),
+    (('ratings', 'difficulty'), 'int'),
+) + _get_stat_fields(ChampionStats._STATS)
+
+_ITEM_FIELDS = (
+    (('id',), 'int'),
+    (('name',), 'string'),
+    (('alias',), 'string'),
+    (('icon_path',), 'string'),
+    (('tooltip',), 'string'),
+    (('cost',), 'int'),
+    (('tier',), 'int'),
+) + tuple(
+    (('stats', name, part), 'float')
+    for name, _ in ItemStats.STATS_TABLE
+    for part in ('flat', 'percentage')
+)
+
+_SKIN_FIELDS = (
+    (('id',), 'int'),
+    (('name',), 'string'),
+    (('internal_name',), 'string'),
+    (('portrait_path',), 'string'),
+    (('splash_path',), 'string'),
+    (('is_base',), 'int'),
+    (('champion_id',), 'int'),
+    (('rank',), 'int'),
+)
+
+
+class _RecordType(object):
+    """Encoding of one kind of record as a fixed width struct."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        # The last value is the string index of the json of other fields
+        self.struct = struct.Struct(
+            '<' + ''.join(_CODES[kind] for _, kind in fields) + 'I'
+        )
+        self._stored = set(path for path, _ in fields)
+
+    def _get_extra(self, record, prefix=()):
+        """Get a copy of record without the fields stored in the struct."""
+        extra = {}
+        for key, value in record.items():
+            path = prefix + (key,)
+            if path in self._stored:
+                continue
+            if isinstance(value, dict):
+                value = self._get_extra(value, path)
+                if not value:
+                    continue
+            extra[key] = value
+        return extra
+
+    def pack(self, record, strings, extra=None):
+        values = []
+        for path, kind in self.fields:
+            value = record
+            for key in path:
+                value = value[key]
+            if kind == 'string':
+                value = _NO_STRING if value is None else strings.add(value)
+            elif value is None:
+                value = float('nan') if kind == 'float' else _NO_INT
+            values.append(value)
+        if extra is None:
+            extra = self._get_extra(record)
+        values.append(strings.add(
+            json.dumps(extra, cls=Encoder, sort_keys=True)
+        ))
+        return self.struct.pack(*values)
+
+    def unpack(self, buffer, offset, get_string):
+        values = self.struct.unpack_from(buffer, offset)
+        record = json.loads(get_string(values[-1]))
+        for (path, kind), value in zip(self.fields, values):
+            if kind == 'string':
+                value = None if value == _NO_STRING else get_string(value)
+            elif kind == 'int' and value == _NO_INT:
+                value = None
+            elif kind == 'float' and value != value:
+                value = None
+            parent = record
+            for key in path[:-1]:
+                parent = parent.setdefault(key, {})
+            parent[path[-1]] = value
+        return record
+
+
+_CHAMPION = _RecordType(_CHAMPION_FIELDS)
+_ITEM = _RecordType(_ITEM_FIELDS)
+_SKIN = _RecordType(_SKIN_FIELDS)
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.strings = []
+        self._indexes = {}
+
+    def add(self, s):
+        index = self._indexes.get(s)
+        if index is None:
+            index = self._indexes[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+
+def _pack_records(record_type, records, strings, get_extra=None):
+    """Get (id, packed record) pairs sorted by id."""
+    packed = []
+    for record in records:
+        extra = get_extra(record) if get_extra is not None else None
+        packed.append((record['id'],
+                       record_type.pack(record, strings, extra)))
+    packed.sort(key=lambda pair: pair[0])
+    return packed
+
+
+def write_binary(f, champions, items):
+    """
+    Write formatted champions and items to file object f in binary.
+
+    items may be a mapping or an iterable of (id, item) pairs.
+
+    """
+    if hasattr(items, 'items'):
+        items = items.items()
+    champions = list(champions)
+    skins = [skin for champion in champions for skin in champion['skins']]
+
+    def get_champion_extra(champion):
+        extra = _CHAMPION._get_extra(champion)
+        extra['skins'] = [skin['id'] for skin in champion['skins']]
+        return extra
+
+    strings = _StringTable()
+    sections = [
+        _pack_records(_CHAMPION, champions, strings, get_champion_extra),
+        _pack_records(_ITEM, (item for _, item in items), strings),
+        _pack_records(_SKIN, skins, strings),
+    ]
+    data = [s.encode('utf-8') for s in strings.strings]
+
+    offset = _HEADER.size + _STRING_INDEX.size * len(data)
+    string_index = []
+    for s in data:
+        string_index.append(_STRING_INDEX.pack(offset, len(s)))
+        offset += len(s)
+
+    tables = []
+    for records in sections:
+        tables.append((offset, len(records)))
+        offset += _TABLE_ENTRY.size * len(records)
+        offset += sum(len(record) for _, record in records)
+
+    f.write(_HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(data),
+        _CHAMPION.struct.size,
+        _ITEM.struct.size,
+        _SKIN.struct.size,
+        *[value for table in tables for value in table]
+    ))
+    for entry in string_index:
+        f.write(entry)
+    for s in data:
+        f.write(s)
+    for (table_offset, _), records in zip(tables, sections):
+        offset = table_offset + _TABLE_ENTRY.size * len(records)
+        for id, record in records:
+            f.write(_TABLE_ENTRY.pack(id, offset))
+            offset += len(record)
+        for _, record in records:
+            f.write(record)
+
+
+class BinaryExport(object):
+    """
+    Reader of files written by write_binary.
+
+    Records are decoded when they are requested and are not kept.
+    Decoded records match read_json output, except that numbers in stat
+    blocks are always floats.
+
+    Typical usage:
+        with BinaryExport(path) as export:
+            ahri = export.get_champion(103)
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                raise ValueError('Truncated binary export: "%s"' % path)
+        try:
+            self._read_header(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self, path):
+        size = len(self._mmap)
+        if size < _HEADER.size:
+            raise ValueError('Truncated binary export: "%s"' % path)
+        header = _HEADER.unpack_from(self._mmap, 0)
+        magic, version, self._string_count = header[:3]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a version %d loldb binary export: "%s"' %
+                             (VERSION, path))
+        sizes = header[3:6]
+        if sizes != (_CHAMPION.struct.size, _ITEM.struct.size,
+                     _SKIN.struct.size):
+            raise ValueError('Record sizes of "%s" do not match' % path)
+        tables = header[6:]
+        self._champions = tables[0:2]
+        self._items = tables[2:4]
+        self._skins = tables[4:6]
+
+        ends = [_HEADER.size + _STRING_INDEX.size * self._string_count]
+        ends.extend(offset + _TABLE_ENTRY.size * count for offset, count in
+                    (self._champions, self._items, self._skins))
+        if max(ends) > size:
+            raise ValueError('Truncated binary export: "%s"' % path)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_string(self, index):
+        offset, length = _STRING_INDEX.unpack_from(
+            self._mmap,
+            _HEADER.size + _STRING_INDEX.size * index
+        )
+        return self._mmap[offset:offset + length].decode('utf-8')
+
+    def _get_ids(self, table):
+        table_offset, count = table
+        return [_TABLE_ENTRY.unpack_from(
+            self._mmap, table_offset + _TABLE_ENTRY.size * i
+        )[0] for i in range(count)]
+
+    def _find(self, table, id):
+        """Binary search a table for the offset of a record, or None."""
+        table_offset, count = table
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, offset = _TABLE_ENTRY.unpack_from(
+                self._mmap,
+                table_offset + _TABLE_ENTRY.size * middle
+            )
+            if entry_id == id:
+                return offset
+            if entry_id < id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _get(self, record_type, table, id):
+        offset = self._find(table, id)
+        if offset is None:
+            return None
+        return record_type.unpack(self._mmap, offset, self.get_string)
+
+    def get_champion_ids(self):
+        return self._get_ids(self._champions)
+
+    def get_item_ids(self):
+        return self._get_ids(self._items)
+
+    def get_skin_ids(self):
+        return self._get_ids(self._skins)
+
+    def get_champion(self, id):
+        """Get a formatted champion by id, or None."""
+        champion = self._get(_CHAMPION, self._champions, id)
+        if champion is not None:
+            champion['skins'] = [self.get_skin(skin_id)
+                                 for skin_id in champion['skins']]
+        return champion
+
+    def get_item(self, id):
+        """Get a formatted item by id, or None."""
+        return self._get(_ITEM, self._items, id)
+
+    def get_skin(self, id):
+        """Get a formatted skin by id, or None."""
+        return self._get(_SKIN, self._skins, id)
+
+    def iter_champions(self):
+        for id in self.get_champion_ids():
+            yield self.get_champion(id)
+
+    def iter_items(self):
+        for id in self.get_item_ids():
+            yield id, self.get_item(id)
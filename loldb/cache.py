@@ -0,0 +1,109 @@
+import hashlib
+import os
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class DiskCache(object):
+    """
+    Size-capped cache of picklable values stored in a local directory.
+
+    Each value is stored in its own file, named by a hash of its key.
+    When the total size exceeds max_size bytes, the least recently used
+    files are evicted. File modification times record recent use, so
+    usage order survives between runs.
+
+    """
+    SUFFIX = '.cache'
+
+    def __init__(self, path, max_size=None):
+        self.path = path
+        self.max_size = max_size
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        # Map of file name to (last use time, size in bytes)
+        self._files = {}
+        for name in os.listdir(path):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(path, name))
+            except OSError:
+                continue
+            self._files[name] = (stat.st_mtime, stat.st_size)
+        self.size = sum(size for _, size in self._files.values())
+
+    def _get_name(self, key):
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + self.SUFFIX
+
+    def _touch(self, name):
+        path = os.path.join(self.path, name)
+        os.utime(path, None)
+        stat = os.stat(path)
+        old_size = self._files.get(name, (0, 0))[1]
+        self._files[name] = (stat.st_mtime, stat.st_size)
+        self.size += stat.st_size - old_size
+
+    def _remove(self, name):
+        _, size = self._files.pop(name, (0, 0))
+        self.size -= size
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError:
+            pass
+
+    def get(self, key, default=None):
+        """Get the value for key, or default if it is not cached."""
+        name = self._get_name(key)
+        try:
+            with open(os.path.join(self.path, name), 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            self._files.pop(name, None)
+            return default
+        if stored_key != key:
+            return default
+        try:
+            self._touch(name)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key, value):
+        """Store value for key, evicting old values if needed."""
+        name = self._get_name(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, value), f, pickle.HIGHEST_PROTOCOL)
+            path = os.path.join(self.path, name)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(temp_path, path)
+            self._touch(name)
+        except (IOError, OSError):
+            # Caching is best-effort, another process may own the file
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._evict(keep=name)
+
+    def _evict(self, keep=None):
+        """Remove least recently used files until under max_size."""
+        if self.max_size is None or self.size <= self.max_size:
+            return
+        names = sorted(self._files, key=lambda name: self._files[name][0])
+        for name in names:
+            if self.size <= self.max_size:
+                break
+            if name != keep:
+                self._remove(name)
+
+    def clear(self):
+        """Remove every cached value."""
+        for name in list(self._files):
+            self._remove(name)
@@ -1,17 +1,17 @@
 import collections
+import multiprocessing
 import warnings
 
 from inibin import Inibin
 
+from . import metrics
 from .ability import Ability
-from .skin import get_skins_for_champion
+from .skin import get_skins_by_champion, get_skins_for_champion
 from .util import alias
 
 
 class Lore(object):
-    body = ''
-    quote = ''
-    quote_author = ''
+    __slots__ = ('body', 'quote', 'quote_author')
 
     def __init__(self, body='', quote='', quote_author=''):
         self.body = body.replace("''", '"')
@@ -36,10 +36,13 @@ class Lore(object):
 
 
 class Ratings(object):
-    attack = 0
-    defense = 0
-    magic = 0
-    difficulty = 0
+    __slots__ = ('attack', 'defense', 'magic', 'difficulty')
+
+    def __init__(self):
+        self.attack = 0
+        self.defense = 0
+        self.magic = 0
+        self.difficulty = 0
 
     def update_from_sql_row(self, row):
         self.attack = row.ratingAttack
@@ -52,16 +55,30 @@ ChampionStat = collections.namedtuple('ChampionStat', 'base per_level')
 
 
 class ChampionStats(object):
-    hp = ChampionStat(0, 0)
-    hp5 = ChampionStat(0, 0)
-    mana = ChampionStat(0, 0)
-    mp5 = ChampionStat(0, 0)
-    damage = ChampionStat(0, 0)
-    attack_speed = ChampionStat(0, 0)
-    armor = ChampionStat(0, 0)
-    magic_resist = ChampionStat(0, 0)
-    range = 0
-    speed = 0
+    __slots__ = (
+        'hp',
+        'hp5',
+        'mana',
+        'mp5',
+        'damage',
+        'attack_speed',
+        'armor',
+        'magic_resist',
+        'range',
+        'speed',
+    )
+
+    def __init__(self):
+        self.hp = ChampionStat(0, 0)
+        self.hp5 = ChampionStat(0, 0)
+        self.mana = ChampionStat(0, 0)
+        self.mp5 = ChampionStat(0, 0)
+        self.damage = ChampionStat(0, 0)
+        self.attack_speed = ChampionStat(0, 0)
+        self.armor = ChampionStat(0, 0)
+        self.magic_resist = ChampionStat(0, 0)
+        self.range = 0
+        self.speed = 0
 
     # TODO: These methods are specific to champion inibins, should they be here?
     @staticmethod
@@ -83,18 +100,7 @@ class ChampionStats(object):
         self.magic_resist = self._create_stat(inibin_map, 'mr')
         self.speed = inibin_map['stats']['speed']
 
-    _STATS = (
-        'hp',
-        'hp5',
-        'mana',
-        'mp5',
-        'damage',
-        'attack_speed',
-        'armor',
-        'magic_resist',
-        'range',
-        'speed',
-    )
+    _STATS = __slots__
 
     def __repr__(self):
         return '<ChampionStats %s>' % ' '.join(
@@ -125,20 +131,34 @@ class Champion(object):
     skins: List of Skin instances
 
     """
-    id = -1
-
-    internal_name = ''
-    name = ''
-    alias = ''
-    title = ''
-
-    icon_path = ''
-    select_sound_path = ''
-
-    _inibin = None
+    __slots__ = (
+        'id',
+        'internal_name',
+        'name',
+        'alias',
+        'title',
+        'icon_path',
+        'select_sound_path',
+        'stats',
+        'lore',
+        'ratings',
+        'tips_as',
+        'tips_against',
+        'tags',
+        'abilities',
+        'skins',
+        '_inibin',
+    )
 
     def __init__(self, internal_name):
+        self.id = -1
         self.internal_name = internal_name
+        self.name = ''
+        self.alias = ''
+        self.title = ''
+        self.icon_path = ''
+        self.select_sound_path = ''
+        self._inibin = None
         self.stats = ChampionStats()
         self.lore = Lore()
         self.ratings = Ratings()
@@ -148,6 +168,10 @@ class Champion(object):
         self.abilities = []
         self.skins = []
 
+    def get_tooltips(self):
+        """Get the tooltips for every level of every ability, in order."""
+        return [ability.get_tooltips() for ability in self.abilities]
+
     def __lt__(self, other):
         return self.id < other.id
 
@@ -155,38 +179,159 @@ class Champion(object):
         return '<Champion {} \'{}\'>'.format(self.id, self.name)
 
 
-def _find_inibin(provider, pattern):
-    raf_master = provider.get_raf_master()
-    raf_results = list(raf_master.find_re(pattern))
-    if not raf_results:
-        warnings.warn('No inibin for %s' % pattern)
-    if len(raf_results) > 1:
+# Methods interpreting an Inibin as each kind of map
+_INIBIN_KINDS = {
+    'champion': Inibin.as_champion,
+    'ability': Inibin.as_ability,
+}
+
+
+def _find_inibin_path(provider, paths):
+    """
+    Get the first of paths present in the RAF archives, or None.
+
+    Paths are tried in order of preference.
+
+    """
+    raf_index = provider.get_raf_index()
+    found = [path for path in paths if path in raf_index]
+    if not found:
+        warnings.warn('No inibin for %s' % paths[0])
+        return None
+    if len(found) > 1:
         # TODO: Is this ever triggered?
-        warnings.warn('Ambiguous inibin for %s' % pattern)
+        warnings.warn('Ambiguous inibin for %s' % paths[0])
+    return found[0]
+
+
+def _read_inibin(provider, path):
     try:
-        inibin = Inibin(data=raf_results[0].read())
+        inibin = Inibin(data=provider.get_raf_index().read(path))
     except Exception:
-        warnings.warn('Malformed inibin for %s' % pattern)
-        inibin = None
+        warnings.warn('Malformed inibin for %s' % path)
+        return None
+    metrics.count('inibins_parsed')
     return inibin
 
 
+def _find_inibin(provider, paths, kind):
+    """
+    Get the inibin map for the first of paths present in the RAF archives.
+
+    kind is a key of _INIBIN_KINDS, and determines how the inibin is
+    interpreted. If the provider has an inibin cache, maps are stored in it
+    keyed by the identity of the archive entry, and later runs use the
+    cached map instead of decompressing and parsing the entry again.
+
+    """
+    path = _find_inibin_path(provider, paths)
+    if path is None:
+        return None
+
+    cache = provider.get_inibin_cache()
+    if cache is not None:
+        key = (
+            kind,
+            provider.language,
+            provider.get_raf_index().fingerprint(path),
+            provider.get_font_config_fingerprint(),
+        )
+        inibin_map = cache.get(key)
+        if inibin_map is not None:
+            metrics.count('inibin_cache_hits')
+            return inibin_map
+
+    inibin = _read_inibin(provider, path)
+    if inibin is None:
+        return None
+    inibin_map = _INIBIN_KINDS[kind](inibin, provider.get_font_config())
+
+    if cache is not None:
+        cache.set(key, inibin_map)
+    return inibin_map
+
+
 def _get_tips_from_string(tips_str):
     """Get list of tips from tips string."""
     return [tip.strip() for tip in tips_str.split('*') if tip]
 
 
-def _get_raw_champion_from_sql_row(row):
+_CHAMPION_COLUMNS = (
+    'id',
+    'name',
+    'displayName',
+    'title',
+    'iconPath',
+    'tags',
+    'description',
+    'quote',
+    'quoteAuthor',
+    'ratingAttack',
+    'ratingDefense',
+    'ratingMagic',
+    'ratingDifficulty',
+    'tips',
+    'opponentTips',
+)
+
+
+def _escape_like(s):
+    """Escape the wildcards of a LIKE pattern, using \\ as the escape."""
+    return s.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _get_champion_filter(terms):
+    """
+    Get SQL condition and parameters for champions matching any of terms.
+
+    Terms are ids, internal names, aliases or tags.
+
+    """
+    conditions = []
+    parameters = []
+    for term in terms:
+        if term.isdigit():
+            conditions.append('id = ?')
+            parameters.append(int(term))
+        else:
+            conditions.append(
+                "(name = ? COLLATE NOCASE OR loldb_alias(displayName) = ? "
+                "OR (',' || tags || ',') LIKE ? ESCAPE '\\')"
+            )
+            parameters.extend([term, alias(term),
+                               '%%,%s,%%' % _escape_like(term)])
+    return ' OR '.join(conditions), tuple(parameters)
+
+
+def get_champion_rows(provider, filters=None):
+    """
+    Generate rows of the champions table with the columns that are used.
+
+    If filters is a list of ids, internal names, aliases or tags, only rows
+    matching one of them are read.
+
+    """
+    where, parameters = None, ()
+    if filters:
+        where, parameters = _get_champion_filter(filters)
+    return provider.get_db_select('champions', _CHAMPION_COLUMNS,
+                                  where=where, parameters=parameters)
+
+
+def _get_raw_champion_from_sql_row(row, champion=None):
     """
     Create a Champion using a row from the champions table in the database.
 
     Champion will be incomplete as stats and abilities are only available
      using inibins;
 
+    If champion is provided it is updated instead.
+
     """
     # TODO: videos? selection sound name?
     # row.name is the internal name
-    champion = Champion(row.name)
+    if champion is None:
+        champion = Champion(row.name)
     # row.displayName is the public name
     champion.name = row.displayName
 
@@ -206,20 +351,20 @@ def _get_raw_champion_from_sql_row(row):
     return champion
 
 
+_CHAMPION_PATH_TEMPLATE = 'data/characters/{0}/{0}.inibin'
+
+
 def _update_raw_champion_with_provider(champion, provider):
     """Update champion stats and abilities."""
     # Find champion inibin
     champ_name = champion.internal_name
-    champ_pattern = '^data/characters/{0}/{0}.inibin$'.format(champ_name)
-    champ_inibin = _find_inibin(provider, champ_pattern)
+    champ_path = _CHAMPION_PATH_TEMPLATE.format(champ_name)
+    champ_inibin = _find_inibin(provider, [champ_path], 'champion')
 
     if champ_inibin is None:
         warnings.warn('Missing inibin for champion %s' % champ_name)
         return
 
-    # Format as champion inibin
-    font_config = provider.get_font_config()
-    champ_inibin = champ_inibin.as_champion(font_config)
     champion._inibin = champ_inibin
 
     # Read stats
@@ -229,9 +374,6 @@ def _update_raw_champion_with_provider(champion, provider):
     _update_champion_passive(champion, champ_inibin)
     _update_champion_abilities(provider, champion, champ_inibin['abilities'])
 
-    # Find skins
-    _update_champion_skins(provider, champion)
-
 
 def _update_champion_passive(champion, inibin):
     # Passive
@@ -255,24 +397,25 @@ def _update_champion_abilities(provider, champion, abilities):
         if ability_inibin is None:
             continue
 
-        # Format as ability inibin
-        font_config = provider.get_font_config()
-        ability_inibin = ability_inibin.as_ability(font_config)
-
         ability = Ability.from_inibin(ability_inibin, i)
 
         if ability is not None:
             champion.abilities.append(ability)
 
 
-_ABILITY_REGEXP_TEMPLATE = r"^data/(?:characters/{0}/)?spells/{1}.inibin$"
+# Champion-specific spells take precedence over shared spells
+_ABILITY_PATH_TEMPLATES = (
+    'data/characters/{0}/spells/{1}.inibin',
+    'data/spells/{1}.inibin',
+)
 
 
 def _find_ability_inibin(provider, champion, ability_name):
     # Find ability inibin
     champ_name = champion.internal_name
-    ability_pattern = _ABILITY_REGEXP_TEMPLATE.format(champ_name, ability_name)
-    ability_inibin = _find_inibin(provider, ability_pattern)
+    ability_paths = [template.format(champ_name, ability_name)
+                     for template in _ABILITY_PATH_TEMPLATES]
+    ability_inibin = _find_inibin(provider, ability_paths, 'ability')
 
     if ability_inibin is None:
         warnings.warn('Missing inibin for ability %s' % ability_name)
@@ -280,14 +423,229 @@ def _find_ability_inibin(provider, champion, ability_name):
     return ability_inibin
 
 
-def _update_champion_skins(provider, champion):
-    skins = get_skins_for_champion(provider, champion.id)
-    skins = sorted(list(skins))
-    champion.skins = skins
+def _update_champion_skins(champion, skins_by_champion):
+    """Set skins from get_skins_by_champion, returns champion."""
+    champion.skins = skins_by_champion.get(champion.id, [])
+    return champion
+
+
+# Provider for the current worker process when extracting in parallel
+_worker_provider = None
+
+
+def _init_worker(provider_class, provider_kwargs):
+    """Open a provider for this worker process."""
+    global _worker_provider
+    _worker_provider = provider_class(**provider_kwargs)
+
+
+def _update_raw_champion_in_worker(champion):
+    _update_raw_champion_with_provider(champion, _worker_provider)
+    return champion
+
+
+def _get_champions_parallel(provider, champions, jobs):
+    """
+    Update champions across a pool of jobs processes.
+
+    Each worker opens its own provider. Champions are returned in id order.
+
+    """
+    champions = sorted(champions)
+    pool = multiprocessing.Pool(
+        jobs,
+        initializer=_init_worker,
+        initargs=(provider.__class__, {
+            'lol_path': provider.base_path,
+            'language': provider.language,
+            'cache_path': provider.cache_path,
+            'cache_size': provider.cache_size,
+            'read_only': provider.read_only,
+            'snapshot': provider.snapshot,
+        }),
+    )
+    try:
+        for champion in pool.imap(_update_raw_champion_in_worker, champions):
+            yield champion
+    finally:
+        pool.close()
+        pool.join()
+
+
+def get_champions_from_rows(provider, rows, jobs=1, skins_by_champion=None):
+    """
+    Generate Champions for rows from the champions table.
 
+    If jobs is greater than one, champions are extracted using that many
+    processes and generated in id order. skins_by_champion is the result of
+    get_skins_by_champion, by default it is read for every champion.
 
-def get_champions(provider):
-    for row in provider.get_db_rows('champions'):
-        champion = _get_raw_champion_from_sql_row(row)
+    """
+    if skins_by_champion is None:
+        skins_by_champion = get_skins_by_champion(provider)
+    champions = (_get_raw_champion_from_sql_row(row) for row in rows)
+    champions = (_update_champion_skins(champion, skins_by_champion)
+                 for champion in champions)
+    if jobs > 1:
+        for champion in _get_champions_parallel(provider, champions, jobs):
+            yield champion
+        return
+    for champion in champions:
         _update_raw_champion_with_provider(champion, provider)
         yield champion
+
+
+def get_champions(provider, jobs=1, filters=None):
+    """
+    Generate all Champions, see get_champions_from_rows.
+
+    If filters is given only matching champions are generated, see
+    get_champion_rows. Only their inibins and skins are read.
+
+    """
+    rows = get_champion_rows(provider, filters)
+    skins_by_champion = None
+    if filters:
+        rows = list(rows)
+        champion_ids = [row.id for row in rows]
+        skins_by_champion = get_skins_by_champion(provider, champion_ids)
+    return get_champions_from_rows(provider, rows, jobs, skins_by_champion)
+
+
+def get_ability_names(champion):
+    """Get the internal names of the abilities in a champion's inibin."""
+    if champion._inibin is None:
+        return []
+    abilities = champion._inibin['abilities']
+    return [abilities[key] for key in _ABILITY_KEYS]
+
+
+def get_inibin_paths(internal_name, ability_names):
+    """
+    Get every RAF path a champion's stats and abilities may be read from.
+
+    Candidate paths are included even if they are absent from the archives.
+
+    """
+    paths = [_CHAMPION_PATH_TEMPLATE.format(internal_name)]
+    for ability_name in ability_names:
+        paths.extend(template.format(internal_name, ability_name)
+                     for template in _ABILITY_PATH_TEMPLATES)
+    return paths
+
+
+class LazyChampion(Champion):
+    """
+    Champion that loads its stats, abilities and skins on first access.
+
+    Stats only need the champion inibin, abilities also need the ability
+    inibins and skins need a query of the championSkins table. Each is
+    loaded from the provider once, then kept.
+
+    """
+    __slots__ = ('_provider', '_inibin_loaded', '_stats', '_abilities',
+                 '_skins')
+
+    def __init__(self, internal_name, provider):
+        super(LazyChampion, self).__init__(internal_name)
+        self._provider = provider
+        self._inibin_loaded = False
+        # None until loaded
+        self._stats = None
+        self._abilities = None
+        self._skins = None
+
+    def _get_inibin(self):
+        if not self._inibin_loaded:
+            path = _CHAMPION_PATH_TEMPLATE.format(self.internal_name)
+            self._inibin = _find_inibin(self._provider, [path], 'champion')
+            self._inibin_loaded = True
+            if self._inibin is None:
+                warnings.warn('Missing inibin for champion %s' %
+                              self.internal_name)
+        return self._inibin
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            stats = ChampionStats()
+            inibin = self._get_inibin()
+            if inibin is not None:
+                stats.update_from_inibin(inibin)
+            self._stats = stats
+        return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+
+    @property
+    def abilities(self):
+        if self._abilities is None:
+            self._abilities = []
+            inibin = self._get_inibin()
+            if inibin is not None:
+                _update_champion_passive(self, inibin)
+                _update_champion_abilities(
+                    self._provider,
+                    self,
+                    inibin['abilities']
+                )
+        return self._abilities
+
+    @abilities.setter
+    def abilities(self, value):
+        self._abilities = value
+
+    @property
+    def skins(self):
+        if self._skins is None:
+            skins = get_skins_for_champion(self._provider, self.id)
+            self._skins = sorted(skins)
+        return self._skins
+
+    @skins.setter
+    def skins(self, value):
+        self._skins = value
+
+
+class LazyChampions(object):
+    """
+    Collection of every champion, loaded lazily.
+
+    Only the champions table is read when the collection is created.
+    Champions are LazyChampion instances, so the RAF archives and skins are
+    only read for the champions and attributes that are used.
+
+    """
+
+    def __init__(self, provider):
+        self.champions = []
+        self._by_id = {}
+        self._by_name = {}
+        self._by_alias = {}
+        for row in get_champion_rows(provider):
+            champion = LazyChampion(row.name, provider)
+            _get_raw_champion_from_sql_row(row, champion)
+            self.champions.append(champion)
+            self._by_id[champion.id] = champion
+            self._by_name[champion.internal_name.lower()] = champion
+            self._by_alias[champion.alias] = champion
+
+    def __iter__(self):
+        return iter(self.champions)
+
+    def __len__(self):
+        return len(self.champions)
+
+    def get(self, id):
+        """Get the champion with an id, or None."""
+        return self._by_id.get(id)
+
+    def get_by_name(self, internal_name):
+        """Get the champion with an internal name, ignoring case, or None."""
+        return self._by_name.get(internal_name.lower())
+
+    def get_by_alias(self, alias):
+        """Get the champion with an alias, or None."""
+        return self._by_alias.get(alias)
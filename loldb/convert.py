@@ -1,11 +1,13 @@
 import json
 
-def format_item(item):
+def format_item(item, recipe_graph=None):
     """
+    If recipe_graph is provided its values for the item are included.
 
     :type item: item.Item
+    :type recipe_graph: recipe.RecipeGraph
     """
-    return {
+    output = {
         'id': item.id,
         'name': item.name,
         'alias': item.alias,
@@ -17,6 +19,23 @@ def format_item(item):
         'categories': item.categories,
         'recipe': item.recipe,
     }
+    if recipe_graph is not None and item.id in recipe_graph:
+        output.update(format_item_recipe(recipe_graph, item.id))
+    return output
+
+
+def format_item_recipe(recipe_graph, item_id):
+    """
+
+    :type recipe_graph: recipe.RecipeGraph
+    """
+    return {
+        'total_cost': recipe_graph.get_total_cost(item_id),
+        'all_components': set(recipe_graph.get_all_components(item_id)),
+        'builds_into': set(recipe_graph.get_builds_into(item_id)),
+        'build_paths': [list(path) for path in
+                        recipe_graph.get_build_paths(item_id)],
+    }
 
 
 def format_item_stats(item_stats):
@@ -163,9 +182,199 @@ def to_json(champions, items, **kwargs):
     }, cls=Encoder, **kwargs)
 
 
+def read_json(f):
+    """
+    Read formatted champions and items from json written by to_json.
+
+    Item ids are converted back to integers. Returns (champions, items).
+
+    """
+    data = json.load(f)
+    items = dict((int(key), item) for key, item in data['items'].items())
+    return data['champions'], items
+
+
+def merge_records(champions, items, new_champions, new_items):
+    """
+    Merge formatted champions and items into existing ones.
+
+    New records replace existing records with the same id, other new
+    champions are appended. Returns (champions, items).
+
+    """
+    new_champions = list(new_champions)
+    new_by_id = dict((champion['id'], champion) for champion in new_champions)
+    merged_champions = [new_by_id.pop(champion['id'], champion)
+                        for champion in champions]
+    merged_champions.extend(champion for champion in new_champions
+                            if champion['id'] in new_by_id)
+    merged_items = dict(items)
+    merged_items.update(new_items)
+    return merged_champions, merged_items
+
+
+def _iter_items(items):
+    """Get (id, item) pairs from a mapping or an iterable of pairs."""
+    if hasattr(items, 'items'):
+        return items.items()
+    return items
+
+
+def write_json(f, champions, items, **kwargs):
+    """
+    Write formatted champions and items to file object f as json.
+
+    The output matches to_json, but champions and items are consumed as
+    iterables and written one record at a time, so the whole document is
+    never held in memory. items may be a mapping or an iterable of
+    (id, item) pairs.
+
+    """
+    encoder = Encoder(**kwargs)
+    f.write('{"champions": [')
+    for i, champion in enumerate(champions):
+        if i:
+            f.write(', ')
+        f.write(encoder.encode(champion))
+    f.write('], "items": {')
+    for i, (key, item) in enumerate(_iter_items(items)):
+        if i:
+            f.write(', ')
+        # json object keys are always strings
+        f.write(encoder.encode(str(key)))
+        f.write(': ')
+        f.write(encoder.encode(item))
+    f.write('}}')
+
+
+def to_ndjson_line(record_type, record):
+    """
+    Convert a formatted record to one line of newline-delimited json.
+
+    Each line is an object with the record type ('champion' or 'item')
+    and the record itself as data.
+
+    """
+    return json.dumps({'type': record_type, 'data': record}, cls=Encoder) + '\n'
+
+
+def write_ndjson(f, champions, items):
+    """
+    Write formatted champions and items to file object f as ndjson.
+
+    Every record is written on its own line as soon as it is consumed,
+    see to_ndjson_line.
+
+    """
+    for champion in champions:
+        f.write(to_ndjson_line('champion', champion))
+    for _, item in _iter_items(items):
+        f.write(to_ndjson_line('item', item))
+
+
 def to_yaml(champions, items):
     import yaml
     return yaml.safe_dump({
         'champions': champions,
         'items': items,
     })
+
+
+def _get_yaml_dumper_class():
+    """
+    Get a safe yaml Dumper class that streams records and handles sets.
+
+    The libyaml emitter is used when it is available. Sets are represented
+    as sorted sequences instead of !!set mappings. Aliases are never
+    emitted, so records can be represented independently of each other.
+
+    """
+    import yaml
+
+    base = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+    class Dumper(base):
+        def ignore_aliases(self, data):
+            return True
+
+        def represent_set(self, data):
+            return self.represent_list(sorted(data))
+
+    Dumper.add_representer(set, Dumper.represent_set)
+    return Dumper
+
+
+def _iter_yaml_node_events(dumper, node):
+    """Generate the events that serialize a representation node."""
+    import yaml
+
+    if isinstance(node, yaml.ScalarNode):
+        detected_tag = dumper.resolve(yaml.ScalarNode, node.value, (True, False))
+        default_tag = dumper.resolve(yaml.ScalarNode, node.value, (False, True))
+        implicit = (node.tag == detected_tag, node.tag == default_tag)
+        yield yaml.ScalarEvent(None, node.tag, implicit, node.value,
+                               style=node.style)
+    elif isinstance(node, yaml.SequenceNode):
+        implicit = node.tag == dumper.resolve(yaml.SequenceNode, node.value,
+                                              True)
+        yield yaml.SequenceStartEvent(None, node.tag, implicit,
+                                      flow_style=node.flow_style)
+        for item in node.value:
+            for event in _iter_yaml_node_events(dumper, item):
+                yield event
+        yield yaml.SequenceEndEvent()
+    elif isinstance(node, yaml.MappingNode):
+        implicit = node.tag == dumper.resolve(yaml.MappingNode, node.value,
+                                              True)
+        yield yaml.MappingStartEvent(None, node.tag, implicit,
+                                     flow_style=node.flow_style)
+        for key, value in node.value:
+            for event in _iter_yaml_node_events(dumper, key):
+                yield event
+            for event in _iter_yaml_node_events(dumper, value):
+                yield event
+        yield yaml.MappingEndEvent()
+
+
+def write_yaml(f, champions, items):
+    """
+    Write formatted champions and items to file object f as yaml.
+
+    The document has the same structure as to_yaml, but is emitted one
+    record at a time as champions and items are consumed, and sets are
+    written as sorted sequences. items may be a mapping, in which case it
+    is written in key order, or an iterable of (id, item) pairs.
+
+    """
+    import yaml
+
+    dumper = _get_yaml_dumper_class()(f)
+
+    def emit_data(data):
+        node = dumper.represent_data(data)
+        for event in _iter_yaml_node_events(dumper, node):
+            dumper.emit(event)
+
+    if hasattr(items, 'items'):
+        items = sorted(items.items())
+
+    dumper.emit(yaml.StreamStartEvent())
+    dumper.emit(yaml.DocumentStartEvent())
+    dumper.emit(yaml.MappingStartEvent(None, None, True, flow_style=False))
+
+    emit_data('champions')
+    dumper.emit(yaml.SequenceStartEvent(None, None, True, flow_style=False))
+    for champion in champions:
+        emit_data(champion)
+    dumper.emit(yaml.SequenceEndEvent())
+
+    emit_data('items')
+    dumper.emit(yaml.MappingStartEvent(None, None, True, flow_style=False))
+    for key, item in items:
+        emit_data(key)
+        emit_data(item)
+    dumper.emit(yaml.MappingEndEvent())
+
+    dumper.emit(yaml.MappingEndEvent())
+    dumper.emit(yaml.DocumentEndEvent())
+    dumper.emit(yaml.StreamEndEvent())
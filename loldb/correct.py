@@ -4,8 +4,12 @@ import warnings
 
 def correct_champions(champions):
     for champion in champions:
-        for ability in champion.abilities:
-            correct_ability(ability)
+        correct_champion(champion)
+
+
+def correct_champion(champion):
+    for ability in champion.abilities:
+        correct_ability(ability)
 
 
 ABILITY_CORRECTIONS = {
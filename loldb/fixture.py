@@ -0,0 +1,389 @@
+"""
+Generate a synthetic, structurally valid game installation.
+
+The installation has the Windows layout: a gameStats sqlite database in
+the air client release, and a RAF archive in the game client containing
+champion and ability inibins and a fontconfig. Every value is generated
+from a seed, so installations of any size can be reproduced.
+
+"""
+import os
+import random
+import sqlite3
+import struct
+import zlib
+
+from inibin import maps
+
+from .ability import Ability
+from .provider import ResourceProvider
+
+RELEASE_VERSION = '0.0.0.1'
+ARCHIVE_VERSION = '0.0.0.1'
+
+TAGS = ('assassin', 'fighter', 'mage', 'marksman', 'support', 'tank')
+CATEGORIES = (
+    'active', 'armor', 'armor_penetration', 'attack_speed', 'boots',
+    'consumable', 'cooldown_reduction', 'critical_strike', 'damage',
+    'health', 'health_regen', 'life_steal', 'magic_resist', 'mana',
+    'mana_regen', 'movement', 'spell_damage', 'spell_vamp',
+)
+ITEM_STATS = (
+    'AbilityPower', 'Armor', 'AttackDamage', 'AttackSpeed', 'CritChance',
+    'CritDamage', 'HPPool', 'HPRegen', 'MagicResist', 'MovementSpeed',
+    'MPPool', 'MPRegen',
+)
+
+_CHAMPION_SCHEMA = '''
+CREATE TABLE champions (
+    id INTEGER PRIMARY KEY, name TEXT, displayName TEXT, title TEXT,
+    iconPath TEXT, portraitPath TEXT, splashPath TEXT, danceVideoPath TEXT,
+    tags TEXT, description TEXT, quote TEXT, quoteAuthor TEXT,
+    range INTEGER, moveSpeed INTEGER, armorBase REAL, armorLevel REAL,
+    manaBase REAL, manaLevel REAL, criticalChanceBase REAL,
+    manaRegenBase REAL, manaRegenLevel REAL, healthRegenBase REAL,
+    healthRegenLevel REAL, magicResistBase REAL, magicResistLevel REAL,
+    healthBase REAL, healthLevel REAL, attackBase REAL, attackLevel REAL,
+    ratingDefense INTEGER, ratingMagic INTEGER, ratingDifficulty INTEGER,
+    ratingAttack INTEGER, tips TEXT, opponentTips TEXT,
+    selectSoundPath TEXT
+);
+CREATE TABLE championSkins (
+    id INTEGER PRIMARY KEY, isBase INTEGER, rank INTEGER,
+    championId INTEGER, name TEXT, displayName TEXT, portraitPath TEXT,
+    splashPath TEXT
+);
+CREATE TABLE itemCategories (id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE itemItemCategories (itemId INTEGER, itemCategoryId INTEGER);
+CREATE TABLE itemRecipes (recipeItemId INTEGER, buildsToItemId INTEGER);
+'''
+
+
+def _get_item_schema():
+    stat_columns = ''.join(
+        ', flat%sMod REAL, percent%sMod REAL' % (stat, stat)
+        for stat in ITEM_STATS
+    )
+    return (
+        'CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, '
+        'description TEXT, iconPath TEXT, price INTEGER, epicness INTEGER'
+        '%s)' % stat_columns
+    )
+
+
+def _get_key(value):
+    """Get the inibin key of a maps value, which may have a function."""
+    if isinstance(value, tuple):
+        return value[0]
+    return value
+
+
+def make_inibin(values):
+    """
+    Encode a version 2 inibin.
+
+    values is a map of integer key to number or string. Numbers are
+    stored as floats, strings in the string table.
+
+    """
+    numbers = sorted((key, value) for key, value in values.items()
+                     if not isinstance(value, (type(u''), bytes)))
+    strings = sorted((key, value) for key, value in values.items()
+                     if isinstance(value, (type(u''), bytes)))
+    flags = 0
+    sections = []
+    if numbers:
+        flags |= 0b10
+        sections.append(struct.pack('<H', len(numbers)))
+        sections.append(struct.pack('<%di' % len(numbers),
+                                    *[key for key, _ in numbers]))
+        sections.append(struct.pack('<%df' % len(numbers),
+                                    *[value for _, value in numbers]))
+    string_data = b''
+    if strings:
+        flags |= 0x1000
+        offsets = []
+        for _, value in strings:
+            if not isinstance(value, bytes):
+                value = value.encode('utf-8')
+            offsets.append(len(string_data))
+            string_data += value + b'\0'
+        sections.append(struct.pack('<H', len(strings)))
+        sections.append(struct.pack('<%di' % len(strings),
+                                    *[key for key, _ in strings]))
+        sections.append(struct.pack('<%dH' % len(strings), *offsets))
+        sections.append(string_data)
+    header = struct.pack('<BHH', 2, len(string_data), flags)
+    return header + b''.join(sections)
+
+
+def _hash_path(path):
+    """Hash a RAF entry path."""
+    value = 0
+    for c in path.lower():
+        value = ((value << 4) + ord(c)) & 0xffffffff
+        high = value & 0xf0000000
+        if high:
+            value ^= high >> 24
+        value &= ~high & 0xffffffff
+    return value
+
+
+def write_raf(path, files):
+    """
+    Write a RAF archive to path and its data to path + '.dat'.
+
+    files is a list of (entry path, data) pairs. Data is compressed.
+
+    """
+    header_size = 20
+    file_list = [struct.pack('<I', len(files))]
+    path_entries = []
+    path_strings = []
+    path_strings_size = 0
+    with open(path + '.dat', 'wb') as dat:
+        offset = 0
+        for i, (entry_path, data) in enumerate(files):
+            data = zlib.compress(data)
+            dat.write(data)
+            file_list.append(struct.pack('<IIII', _hash_path(entry_path),
+                                         offset, len(data), i))
+            offset += len(data)
+            encoded = entry_path.encode('utf-8') + b'\0'
+            path_entries.append((path_strings_size, len(encoded)))
+            path_strings.append(encoded)
+            path_strings_size += len(encoded)
+    file_list = b''.join(file_list)
+
+    paths_offset = header_size + len(file_list)
+    # Path string offsets are relative to the start of the path list
+    strings_start = 8 + 8 * len(files)
+    path_list = [struct.pack('<II', strings_start + path_strings_size,
+                             len(files))]
+    for string_offset, length in path_entries:
+        path_list.append(struct.pack('<II', strings_start + string_offset,
+                                     length))
+    path_list.extend(path_strings)
+
+    with open(path, 'wb') as f:
+        f.write(b'\xf0\x0e\xbe\x18')
+        f.write(struct.pack('<IIII', 1, 0, header_size, paths_offset))
+        f.write(file_list)
+        f.write(b''.join(path_list))
+
+
+class _Generator(object):
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.font_config = []
+        self.files = []
+
+    def translate(self, key, text):
+        """Add a fontconfig entry, returning its key."""
+        self.font_config.append('tr "%s" = "%s"' % (key, text))
+        return key
+
+    def uniform(self, low, high):
+        return round(self.random.uniform(low, high), 3)
+
+    def add_champion_inibin(self, internal_name, ability_names):
+        stats = maps.CHAMPION['stats']
+        uniform = self.uniform
+        values = {
+            _get_key(stats['hp']['base']): uniform(350, 650),
+            _get_key(stats['hp']['per_level']): uniform(70, 100),
+            # Regeneration is stored per second
+            _get_key(stats['hp5']['base']): uniform(0.8, 1.8),
+            _get_key(stats['hp5']['per_level']): uniform(0.1, 0.2),
+            _get_key(stats['mana']['base']): uniform(0, 350),
+            _get_key(stats['mana']['per_level']): uniform(0, 60),
+            _get_key(stats['mp5']['base']): uniform(0, 1.6),
+            _get_key(stats['mp5']['per_level']): uniform(0, 0.2),
+            _get_key(stats['range']): self.random.choice((125, 175, 550)),
+            _get_key(stats['dmg']['base']): uniform(45, 60),
+            _get_key(stats['dmg']['per_level']): uniform(2.5, 4),
+            # Attack delay
+            _get_key(stats['aspd']['base']): uniform(-0.1, 0.05),
+            # Integer percentage
+            _get_key(stats['aspd']['per_level']): uniform(1, 4),
+            _get_key(stats['armor']['base']): uniform(10, 20),
+            _get_key(stats['armor']['per_level']): uniform(3, 4),
+            _get_key(stats['mr']['base']): 30,
+            _get_key(stats['mr']['per_level']): uniform(0, 1.25),
+            _get_key(stats['speed']): self.random.choice(range(325, 356, 5)),
+            maps.CHAMPION['passive']: self.translate(
+                'game_character_passivename_%s' % internal_name,
+                '%s Passive' % internal_name,
+            ),
+            maps.CHAMPION['passive_desc']: 'Passive of %s.' % internal_name,
+            maps.CHAMPION['passive_icon']: '%s_Passive.dds' % internal_name,
+        }
+        for i, ability_name in enumerate(ability_names):
+            values[maps.CHAMPION['abilities']['skill%d' % (i + 1)]] = \
+                ability_name
+        self.files.append((
+            'DATA/Characters/{0}/{0}.inibin'.format(internal_name),
+            make_inibin(values),
+        ))
+
+    def add_ability_inibin(self, internal_name, ability_name):
+        uniform = self.uniform
+        values = {
+            maps.ABILITY['name']: self.translate(
+                'game_spell_displayname_%s' % ability_name,
+                '%s Spell' % ability_name,
+            ),
+            maps.ABILITY['internalName']: ability_name,
+            maps.ABILITY['desc']: 'Spell of %s.' % internal_name,
+            maps.ABILITY['tooltip']: self.translate(
+                'game_spell_tooltip_%s' % ability_name,
+                '<mainText>Deals @Effect1Amount@ (+@CharAbilityPower@) '
+                'magic damage and slows by @Effect2Amount@%.</mainText>',
+            ),
+            maps.ABILITY['img']: '%s.dds' % ability_name,
+            maps.ABILITY['range']: self.random.choice((600, 800, 1000)),
+            _get_key(maps.ABILITY['scale1']): uniform(0.3, 1),
+            _get_key(maps.ABILITY['scale2']): 0,
+        }
+        damage = uniform(40, 80)
+        cooldown = uniform(6, 14)
+        cost = uniform(50, 80)
+        for i, level in enumerate(Ability.LEVELS):
+            values[maps.ABILITY['effect1'][level]] = damage + 40 * i
+            values[maps.ABILITY['effect2'][level]] = 10 + 5 * i
+            values[maps.ABILITY['cooldown'][level]] = cooldown - i
+            values[maps.ABILITY['cost'][level]] = cost + 5 * i
+        self.files.append((
+            'DATA/Characters/%s/Spells/%s.inibin' % (internal_name,
+                                                     ability_name),
+            make_inibin(values),
+        ))
+
+
+def _get_champion_row(generator, id, internal_name, name):
+    randint = generator.random.randint
+    tags = generator.random.sample(TAGS, randint(1, 2))
+    return (
+        id, internal_name, name, 'the Generated',
+        '%s_Square_0.png' % internal_name, '%s_0.jpg' % internal_name,
+        '%s_Splash_0.jpg' % internal_name, '%s_Dance.webm' % internal_name,
+        ','.join(tags), 'Lore of %s.' % name, 'Quote of %s.' % name, name,
+    ) + (0,) * 17 + (
+        randint(1, 10), randint(1, 10), randint(1, 10), randint(1, 10),
+        '*Tip one for %s.*Tip two.' % name, '*Tip against %s.' % name,
+        '%s.mp3' % internal_name,
+    )
+
+
+def _get_item_rows(generator, count):
+    """Generate item rows, category rows and recipe rows."""
+    randint = generator.random.randint
+    item_rows = []
+    category_rows = []
+    recipe_rows = []
+    for i in range(count):
+        id = 1001 + i
+        stats = dict(
+            (stat, randint(1, 50))
+            for stat in generator.random.sample(ITEM_STATS, randint(1, 3))
+        )
+        columns = []
+        for stat in ITEM_STATS:
+            columns.extend((stats.get(stat, 0), 0))
+        # Early items are components, later items may build from them.
+        # Components are drawn one at a time, so generating is linear in
+        # the number of items.
+        components = set()
+        if i >= 20 and generator.random.random() < 0.6:
+            component_count = randint(1, 3)
+            while len(components) < component_count:
+                components.add(randint(1001, 1000 + i // 2))
+        item_rows.append((
+            id, 'Item %d' % id,
+            '<stats>+%d Ability Power</stats><br><br>Generated.' % i,
+            '%d_Item.png' % id, randint(1, 40) * 25, len(components) and 2,
+        ) + tuple(columns))
+        for category in generator.random.sample(
+                range(1, len(CATEGORIES) + 1), randint(1, 3)):
+            category_rows.append((id, category))
+        for component in sorted(components):
+            recipe_rows.append((component, id))
+    return item_rows, category_rows, recipe_rows
+
+
+def _insert(db, table, rows):
+    if rows:
+        db.executemany(
+            'INSERT INTO %s VALUES (%s)' %
+            (table, ', '.join('?' * len(rows[0]))),
+            rows
+        )
+
+
+def write_fixture(path, champions=100, items=200, skins=5, seed=0,
+                  language='en_US'):
+    """
+    Write a synthetic installation to directory path.
+
+    champions and items are the number of each to generate, skins is the
+    number of skins per champion. The installation can be read by a
+    LinuxResourceProvider or WindowsResourceProvider with lol_path set to
+    path.
+
+    """
+    generator = _Generator(seed)
+
+    champion_rows = []
+    skin_rows = []
+    for id in range(1, champions + 1):
+        internal_name = 'Champion%d' % id
+        name = 'Champion %d' % id
+        champion_rows.append(_get_champion_row(generator, id, internal_name,
+                                               name))
+        for rank in range(skins):
+            skin_rows.append((
+                id * 1000 + rank, int(rank == 0), rank, id,
+                '%s%d' % (internal_name, rank), 'Skin %d %s' % (rank, name),
+                '%s_%d.jpg' % (internal_name, rank),
+                '%s_Splash_%d.jpg' % (internal_name, rank),
+            ))
+        ability_names = ['%s%s' % (internal_name, key) for key in Ability.KEYS]
+        generator.add_champion_inibin(internal_name, ability_names)
+        for ability_name in ability_names:
+            generator.add_ability_inibin(internal_name, ability_name)
+    item_rows, item_category_rows, recipe_rows = _get_item_rows(generator,
+                                                                items)
+
+    db_directory = os.path.join(
+        path, 'RADS/projects/lol_air_client/releases', RELEASE_VERSION,
+        'deploy/assets/data/gameStats',
+    )
+    os.makedirs(db_directory)
+    db = sqlite3.connect(
+        os.path.join(db_directory, 'gameStats_%s.sqlite' % language)
+    )
+    try:
+        db.executescript(_CHAMPION_SCHEMA)
+        db.execute(_get_item_schema())
+        with db:
+            _insert(db, 'champions', champion_rows)
+            _insert(db, 'championSkins', skin_rows)
+            _insert(db, 'items', item_rows)
+            _insert(db, 'itemCategories', list(enumerate(CATEGORIES, 1)))
+            _insert(db, 'itemItemCategories', item_category_rows)
+            _insert(db, 'itemRecipes', recipe_rows)
+    finally:
+        db.close()
+
+    archive_directory = os.path.join(
+        path, 'RADS/projects/lol_game_client/filearchives', ARCHIVE_VERSION
+    )
+    os.makedirs(archive_directory)
+    font_config = '\n'.join(generator.font_config) + '\n'
+    # Providers read the en_US fontconfig whatever the language
+    generator.files.append((
+        'DATA/Menu/%s' % ResourceProvider.FONT_CONFIG_NAME,
+        font_config.encode('utf-8'),
+    ))
+    write_raf(os.path.join(archive_directory, 'Archive_1.raf'),
+              generator.files)
@@ -0,0 +1,246 @@
+import collections
+import hashlib
+import inspect
+import json
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from . import correct
+from .champion import (
+    get_ability_names,
+    get_champion_rows,
+    get_champions_from_rows,
+    get_inibin_paths,
+)
+from .convert import Encoder
+from .recipe import get_recipe_graph
+
+
+ChampionEntry = collections.namedtuple(
+    'ChampionEntry',
+    'fingerprint ability_names record'
+)
+ItemEntry = collections.namedtuple('ItemEntry', 'fingerprint record')
+
+
+class Manifest(object):
+    """
+    Fingerprints and formatted records of every champion and item in a run.
+
+    Instance variables:
+    version: loldb version that produced the manifest
+    language: language of the records
+    corrections: Fingerprint of the corrections applied to champions, or
+        None if they were skipped
+    champion_ids: List of champion ids, in output order
+    champions: Map of champion id to ChampionEntry
+    items: Map of item id to ItemEntry
+
+    """
+
+    def __init__(self, version, language, corrections=None):
+        self.version = version
+        self.language = language
+        self.corrections = corrections
+        self.champion_ids = []
+        self.champions = {}
+        self.items = {}
+
+    def is_compatible(self, version, language, corrections=None):
+        """Check if records in the manifest can be reused by a run."""
+        return (self.version == version and self.language == language and
+                getattr(self, 'corrections', None) == corrections)
+
+    def get_champion_records(self):
+        return [self.champions[id].record for id in self.champion_ids]
+
+    def get_item_records(self):
+        return dict((id, entry.record) for id, entry in self.items.items())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+
+
+def _fingerprint(*parts):
+    """Hash parts, which must have a deterministic repr."""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def get_corrections_fingerprint():
+    """
+    Hash the source of loldb.correct.
+
+    The corrections table holds functions, which have no deterministic
+    repr, so the module source stands in for it.
+
+    """
+    return _fingerprint(inspect.getsource(correct))
+
+
+def _group_rows(rows, column):
+    """Group rows by the value of column, rows are converted to tuples."""
+    groups = collections.defaultdict(list)
+    for row in rows:
+        groups[getattr(row, column)].append(tuple(row))
+    for group in groups.values():
+        group.sort()
+    return groups
+
+
+class IncrementalBuild(object):
+    """
+    Rebuild only the champions and items whose inputs have changed.
+
+    Champion inputs are the champion row, its skin rows and the identities
+    of the RAF entries its inibins are read from. Item inputs are the item
+    row, its category and recipe rows. Records with unchanged inputs are
+    copied from the previous manifest, unless it was built with a
+    different version, language or corrections.
+
+    Typical usage:
+        build = IncrementalBuild(provider, version, previous_manifest,
+                                 skip_corrections)
+        for champion in build.get_champions():
+            build.add_champion(champion, format_champion(champion))
+        build.add_items(formatted_items)
+        build.manifest.save(path)
+
+    """
+
+    def __init__(self, provider, version, previous=None,
+                 skip_corrections=False):
+        self.provider = provider
+        corrections = None
+        if not skip_corrections:
+            corrections = get_corrections_fingerprint()
+        if previous is None or not previous.is_compatible(
+                version, provider.language, corrections):
+            previous = Manifest(version, provider.language, corrections)
+        self.previous = previous
+        self.manifest = Manifest(version, provider.language, corrections)
+        self.changed_champion_ids = set()
+        self.changed_item_ids = set()
+        self._champion_rows = {}
+        self._skin_rows = _group_rows(
+            provider.get_db_rows('championSkins'),
+            'championId'
+        )
+
+    def _get_champion_fingerprint(self, row, ability_names):
+        raf_index = self.provider.get_raf_index()
+        paths = get_inibin_paths(row.name, ability_names)
+        return _fingerprint(
+            tuple(row),
+            self._skin_rows.get(row.id, []),
+            [raf_index.fingerprint(path) for path in paths],
+            self.provider.get_font_config_fingerprint(),
+        )
+
+    def get_champions(self, jobs=1):
+        """
+        Generate Champions whose inputs changed since the previous manifest.
+
+        Every generated champion must be passed to add_champion.
+
+        """
+        changed_rows = []
+        for row in get_champion_rows(self.provider):
+            self.manifest.champion_ids.append(row.id)
+            entry = self.previous.champions.get(row.id)
+            if entry is not None:
+                fingerprint = self._get_champion_fingerprint(
+                    row,
+                    entry.ability_names
+                )
+                if fingerprint == entry.fingerprint:
+                    self.manifest.champions[row.id] = entry
+                    continue
+            self._champion_rows[row.id] = row
+            changed_rows.append(row)
+        return get_champions_from_rows(self.provider, changed_rows, jobs)
+
+    def add_champion(self, champion, record):
+        """Add the formatted record for a champion from get_champions."""
+        row = self._champion_rows.pop(champion.id)
+        ability_names = get_ability_names(champion)
+        fingerprint = self._get_champion_fingerprint(row, ability_names)
+        self.manifest.champions[champion.id] = ChampionEntry(
+            fingerprint,
+            ability_names,
+            record,
+        )
+        self.changed_champion_ids.add(champion.id)
+
+    def add_items(self, records):
+        """
+        Add formatted records for all items.
+
+        Items are read entirely from the database, so they are cheap to
+        rebuild. Only records with changed inputs are marked as changed.
+        Inputs include what the recipe graph derives for the item, such as
+        its total cost.
+
+        """
+        provider = self.provider
+        recipe_graph = get_recipe_graph(provider)
+        categories = sorted(tuple(row) for row in
+                            provider.get_db_rows('itemCategories'))
+        item_categories = _group_rows(
+            provider.get_db_rows('itemItemCategories'),
+            'itemId'
+        )
+        recipes = _group_rows(
+            provider.get_db_rows('itemRecipes'),
+            'buildsToItemId'
+        )
+        for row in provider.get_db_rows('items'):
+            if row.id not in records:
+                continue
+            fingerprint = _fingerprint(
+                tuple(row),
+                categories,
+                item_categories.get(row.id, []),
+                recipes.get(row.id, []),
+                recipe_graph.get_signature(row.id),
+            )
+            entry = self.previous.items.get(row.id)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self.manifest.items[row.id] = entry
+                continue
+            self.manifest.items[row.id] = ItemEntry(fingerprint, records[row.id])
+            self.changed_item_ids.add(row.id)
+
+    def get_delta(self):
+        """
+        Get changes from the previous manifest.
+
+        Returns a dictionary of changed champion records, changed item
+        records, and the ids of removed champions and items.
+
+        """
+        manifest = self.manifest
+        return {
+            'champions': [manifest.champions[id].record
+                          for id in manifest.champion_ids
+                          if id in self.changed_champion_ids],
+            'items': dict((id, manifest.items[id].record)
+                          for id in self.changed_item_ids),
+            'removed_champions': sorted(set(self.previous.champions) -
+                                        set(manifest.champions)),
+            'removed_items': sorted(set(self.previous.items) -
+                                    set(manifest.items)),
+        }
+
+
+def to_json_delta(delta, **kwargs):
+    """Convert delta from IncrementalBuild.get_delta to json."""
+    return json.dumps(delta, cls=Encoder, **kwargs)
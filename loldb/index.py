@@ -0,0 +1,133 @@
+import bisect
+import collections
+
+from .convert import format_champion, format_item
+from .util import alias
+
+
+def _find_prefix(names, prefix):
+    """Generate ids of sorted (name, id) pairs where name has prefix."""
+    i = bisect.bisect_left(names, (prefix,))
+    while i < len(names) and names[i][0].startswith(prefix):
+        yield names[i][1]
+        i += 1
+
+
+class ExportIndex(object):
+    """
+    Secondary indexes of formatted champions and items.
+
+    Champions are indexed by id, internal name, alias, name, tag and skin
+    id. Items are indexed by id, name, alias and category. Names and tags
+    are matched case insensitively. Lookups return formatted records,
+    sorted by id.
+
+    Typical usage:
+        champions, items = read_json(f)
+        index = ExportIndex(champions, items)
+        mages = index.find_champions('mage')
+
+    """
+
+    def __init__(self, champions, items):
+        """
+        champions is a list of formatted champions and items is a map of
+        item id to formatted item, as returned by read_json.
+
+        """
+        self.champions = dict((record['id'], record) for record in champions)
+        self.items = dict(items)
+
+        self._champion_keys = collections.defaultdict(set)
+        self._champion_tags = collections.defaultdict(set)
+        self._skin_champions = {}
+        champion_names = []
+        for id, record in self.champions.items():
+            for key in (record['internal_name'].lower(), record['alias'],
+                        alias(record['name'])):
+                self._champion_keys[key].add(id)
+            for tag in record['tags']:
+                self._champion_tags[tag.lower()].add(id)
+            for skin in record['skins']:
+                self._skin_champions[skin['id']] = id
+            champion_names.append((record['name'].lower(), id))
+        self._champion_names = sorted(champion_names)
+
+        self._item_keys = collections.defaultdict(set)
+        self._item_categories = collections.defaultdict(set)
+        item_names = []
+        for id, record in self.items.items():
+            for key in (record['name'].lower(), record['alias']):
+                self._item_keys[key].add(id)
+            for category in record['categories']:
+                self._item_categories[category.lower()].add(id)
+            item_names.append((record['name'].lower(), id))
+        self._item_names = sorted(item_names)
+
+    @classmethod
+    def from_models(cls, champions, items):
+        """Build index from Champions and a map of item id to Item."""
+        return cls(
+            [format_champion(champion) for champion in champions],
+            dict((id, format_item(item)) for id, item in items.items()),
+        )
+
+    @staticmethod
+    def _get_records(records, ids):
+        return [records[id] for id in sorted(set(ids))]
+
+    def get_champion(self, id):
+        """Get a champion by id, or None."""
+        return self.champions.get(id)
+
+    def get_champion_by_skin(self, skin_id):
+        """Get the champion with a skin id, or None."""
+        return self.champions.get(self._skin_champions.get(skin_id))
+
+    def get_champions_by_tag(self, tag):
+        return self._get_records(self.champions,
+                                 self._champion_tags.get(tag.lower(), ()))
+
+    def find_champions(self, term):
+        """Get champions matching an id, internal name, alias or tag."""
+        if term.isdigit():
+            ids = [int(term)] if int(term) in self.champions else []
+        else:
+            ids = (self._champion_keys.get(term.lower(), set()) |
+                   self._champion_keys.get(alias(term), set()) |
+                   self._champion_tags.get(term.lower(), set()))
+        return self._get_records(self.champions, ids)
+
+    def find_champions_by_prefix(self, prefix):
+        """Get champions whose name starts with prefix."""
+        return self._get_records(
+            self.champions,
+            _find_prefix(self._champion_names, prefix.lower())
+        )
+
+    def get_item(self, id):
+        """Get an item by id, or None."""
+        return self.items.get(id)
+
+    def get_items_by_category(self, category):
+        return self._get_records(
+            self.items,
+            self._item_categories.get(category.lower(), ())
+        )
+
+    def find_items(self, term):
+        """Get items matching an id, name, alias or category."""
+        if term.isdigit():
+            ids = [int(term)] if int(term) in self.items else []
+        else:
+            ids = (self._item_keys.get(term.lower(), set()) |
+                   self._item_keys.get(alias(term), set()) |
+                   self._item_categories.get(term.lower(), set()))
+        return self._get_records(self.items, ids)
+
+    def find_items_by_prefix(self, prefix):
+        """Get items whose name starts with prefix."""
+        return self._get_records(
+            self.items,
+            _find_prefix(self._item_names, prefix.lower())
+        )
@@ -7,19 +7,6 @@ ItemStat = collections.namedtuple('ItemStat', 'flat percentage')
 
 
 class ItemStats(object):
-    ap = ItemStat(0, 0)
-    armor = ItemStat(0, 0)
-    damage = ItemStat(0, 0)
-    attack_speed = ItemStat(0, 0)
-    crit_chance = ItemStat(0, 0)
-    crit_damage = ItemStat(0, 0)
-    hp = ItemStat(0, 0)
-    hp5 = ItemStat(0, 0)
-    magic_resist = ItemStat(0, 0)
-    movement_speed = ItemStat(0, 0)
-    mana = ItemStat(0, 0)
-    mp5 = ItemStat(0, 0)
-
     STATS_TABLE = [
         ('ap', 'AbilityPower'),
         ('armor', 'Armor'),
@@ -35,12 +22,25 @@ class ItemStats(object):
         ('mp5', 'MPRegen'),
     ]
 
-    def update_from_sql_row(self, row):
-        row = row._asdict()
+    # (name, flat column, percentage column) for each stat
+    STAT_COLUMNS = [
+        (name, 'flat%sMod' % key, 'percent%sMod' % key)
+        for name, key in STATS_TABLE
+    ]
+    COLUMNS = tuple(column for _, flat_column, percentage_column
+                    in STAT_COLUMNS
+                    for column in (flat_column, percentage_column))
+
+    __slots__ = tuple(name for name, _ in STATS_TABLE)
+
+    def __init__(self):
+        for name, _ in self.STATS_TABLE:
+            setattr(self, name, ItemStat(0, 0))
 
-        for name, key in self.STATS_TABLE:
-            flat = row['flat%sMod' % key]
-            percentage = row['percent%sMod' % key]
+    def update_from_sql_row(self, row):
+        for name, flat_column, percentage_column in self.STAT_COLUMNS:
+            flat = getattr(row, flat_column)
+            percentage = getattr(row, percentage_column)
             if name.endswith('p5'):
                 flat *= 5
                 # TODO: Should percentage be multiplied?
@@ -57,18 +57,27 @@ class ItemStats(object):
 
 
 class Item(object):
-    id = -1
-    name = ''
-    alias = ''
-    icon_path = ''
-    cost = 0
-    tooltip = ''
-    tier = 0  # TODO
-    stats = None
-    categories = set()
-    recipe = set()
+    __slots__ = (
+        'id',
+        'name',
+        'alias',
+        'icon_path',
+        'cost',
+        'tooltip',
+        'tier',
+        'stats',
+        'categories',
+        'recipe',
+    )
 
     def __init__(self):
+        self.id = -1
+        self.name = ''
+        self.alias = ''
+        self.icon_path = ''
+        self.cost = 0
+        self.tooltip = ''
+        self.tier = 0  # TODO
         self.stats = ItemStats()
         self.categories = set()
         self.recipe = set()
@@ -77,7 +86,41 @@ class Item(object):
         return '<Item %s \'%s\'>' % (self.id, self.name)
 
 
-def _get_item_map(provider):
+_ITEM_COLUMNS = (
+    'id',
+    'name',
+    'iconPath',
+    'price',
+    'description',
+    'epicness',
+) + ItemStats.COLUMNS
+
+
+def _get_item_filter(terms):
+    """
+    Get SQL condition and parameters for items matching any of terms.
+
+    Terms are ids, names, aliases or category names.
+
+    """
+    conditions = []
+    parameters = []
+    for term in terms:
+        if term.isdigit():
+            conditions.append('id = ?')
+            parameters.append(int(term))
+        else:
+            conditions.append(
+                '(name = ? COLLATE NOCASE OR loldb_alias(name) = ? OR id IN ('
+                'SELECT itemId FROM itemItemCategories JOIN itemCategories '
+                'ON itemCategoryId = itemCategories.id '
+                'WHERE itemCategories.name = ? COLLATE NOCASE))'
+            )
+            parameters.extend([term, alias(term), term])
+    return ' OR '.join(conditions), tuple(parameters)
+
+
+def _get_item_map(provider, where=None, parameters=()):
     """
     Return map of item ids to incomplete Items.
 
@@ -85,7 +128,9 @@ def _get_item_map(provider):
 
     """
     items = {}
-    for row in provider.get_db_rows('items'):
+    rows = provider.get_db_select('items', _ITEM_COLUMNS, where=where,
+                                  parameters=parameters)
+    for row in rows:
         item = Item()
         item.id = row.id
         item.name = row.name
@@ -105,13 +150,28 @@ def _get_item_map(provider):
 
 def _get_categories(provider):
     """Generate category (id, name) tuples."""
-    for row in provider.get_db_rows('itemCategories'):
-        yield row.id, row.name
+    for row in provider.get_db_select('itemCategories', ('id', 'name'),
+                                      named=False):
+        yield row
+
+
+def _get_item_subquery(column, where):
+    """Get SQL condition for column being the id of an item matching where."""
+    if not where:
+        return None
+    return '%s IN (SELECT id FROM items WHERE %s)' % (column, where)
 
 
-def _set_item_categories(provider, items):
+def _set_item_categories(provider, items, where=None, parameters=()):
     categories = dict(_get_categories(provider))
-    for row in provider.get_db_rows('itemItemCategories'):
+    columns = ('itemId', 'itemCategoryId')
+    rows = provider.get_db_select(
+        'itemItemCategories',
+        columns,
+        where=_get_item_subquery('itemId', where),
+        parameters=parameters,
+    )
+    for row in rows:
         if row.itemId not in items:
             warnings.warn('Category applies to invalid item id %s' % row.itemId)
             continue
@@ -121,13 +181,26 @@ def _set_item_categories(provider, items):
         items[row.itemId].categories.add(category_name)
 
 
-def _set_item_recipes(provider, items):
-    for row in provider.get_db_rows('itemRecipes'):
+def _set_item_recipes(provider, items, where=None, parameters=()):
+    # Components of filtered items need not match the filter
+    item_ids = items
+    if where:
+        rows = provider.get_db_select('items', ('id',), named=False)
+        item_ids = set(id for id, in rows)
+
+    columns = ('buildsToItemId', 'recipeItemId')
+    rows = provider.get_db_select(
+        'itemRecipes',
+        columns,
+        where=_get_item_subquery('buildsToItemId', where),
+        parameters=parameters,
+    )
+    for row in rows:
         if row.buildsToItemId not in items:
             warnings.warn('Missing recipe result item id %s' %
                           row.buildsToItemId)
             continue
-        if row.recipeItemId not in items:
+        if row.recipeItemId not in item_ids:
             warnings.warn('Missing recipe component id %s for item id %s' %
                           (row.recipeItemId, row.buildsToItemId))
             continue
@@ -135,9 +208,18 @@ def _set_item_recipes(provider, items):
         item.recipe.add(row.recipeItemId)
 
 
-def get_items(provider):
-    """Return dictionary of all Items."""
-    items = _get_item_map(provider)
-    _set_item_categories(provider, items)
-    _set_item_recipes(provider, items)
+def get_items(provider, filters=None):
+    """
+    Return dictionary of all Items.
+
+    If filters is a list of ids, names, aliases or category names, only
+    items matching one of them are read.
+
+    """
+    where, parameters = None, ()
+    if filters:
+        where, parameters = _get_item_filter(filters)
+    items = _get_item_map(provider, where, parameters)
+    _set_item_categories(provider, items, where, parameters)
+    _set_item_recipes(provider, items, where, parameters)
     return items
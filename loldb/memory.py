@@ -0,0 +1,189 @@
+"""
+Memory use of the stages recorded by loldb.metrics.
+
+Where tracemalloc can be imported (Python 3) every stage records its
+traced peak and growth, with the top allocation sites of its first call.
+The traced peak needs tracemalloc.reset_peak, from Python 3.9. Elsewhere
+the growth of the maximum resident set size of each stage is recorded
+instead, which shows the stages that drive the peak of the process. The
+resource module is Unix only, without either module no sizes are
+recorded.
+
+Every stage also records the live instances of each model class after
+each of its calls, which shows the records a stage retains. Counts can
+be taken at any other point with count_objects.
+
+Typical usage:
+    memory = MemoryRecorder()
+    metrics.enable(memory=memory)
+    ...
+    memory.count_objects('end')
+    report = memory.to_dict()
+
+"""
+import collections
+import gc
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from .ability import Ability, AbilityLevel
+from .champion import Champion, ChampionStats, Lore, Ratings
+from .item import Item, ItemStats
+from .skin import Skin
+
+MODEL_CLASSES = (
+    Champion,
+    ChampionStats,
+    Lore,
+    Ratings,
+    Ability,
+    AbilityLevel,
+    Skin,
+    Item,
+    ItemStats,
+)
+
+TOP_SITES = 10
+
+
+def get_max_rss():
+    """
+    Get the maximum resident set size of this process in bytes, or None
+    without the resource module.
+
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, OS X bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def count_objects():
+    """Get a map of model class name to its number of live instances."""
+    counts = collections.Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, MODEL_CLASSES):
+            counts[type(obj).__name__] += 1
+    return dict(counts)
+
+
+class StageMemory(object):
+    """
+    Memory use of every call of a stage.
+
+    Instance variables:
+    traced_growth: Bytes allocated and not freed, or None
+    traced_peak: Largest traced size during a call, or None
+    top_sites: List of (site, bytes, allocations) retained by the first
+        call, largest first
+    rss_growth: Bytes the maximum resident set size grew by, or None.
+        Only recorded without tracemalloc.
+    objects: Map of model class name to live instances after the latest
+        call
+
+    """
+    __slots__ = ('traced_growth', 'traced_peak', 'top_sites', 'rss_growth',
+                 'objects')
+
+    def __init__(self):
+        self.traced_growth = None
+        self.traced_peak = None
+        self.top_sites = []
+        self.rss_growth = None
+        self.objects = {}
+
+
+class MemoryRecorder(object):
+    """
+    Recorder of the memory use of stages, see loldb.metrics.enable.
+
+    Stages must not be nested, the traced peak is reset when a stage starts.
+    Tracing and counting objects are slow, so tracemalloc is only started
+    by a recorder.
+
+    """
+
+    def __init__(self, top_sites=TOP_SITES):
+        self.top_sites = top_sites
+        self.stages = collections.OrderedDict()
+        self.objects = collections.OrderedDict()
+        self.tracing = tracemalloc is not None
+        if self.tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+
+    def start(self, name):
+        """Start a call of stage name, returns the state to pass to stop."""
+        if not self.tracing:
+            return get_max_rss(), None, None
+        snapshot = None
+        if name not in self.stages:
+            snapshot = self._take_snapshot()
+        # Python 3.9 and later
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return None, tracemalloc.get_traced_memory()[0], snapshot
+
+    def stop(self, name, state):
+        max_rss, traced, snapshot = state
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMemory()
+        if self.tracing:
+            self._stop_tracing(stage, traced, snapshot)
+        elif max_rss is not None:
+            stage.rss_growth = (stage.rss_growth or 0) + \
+                get_max_rss() - max_rss
+        stage.objects = count_objects()
+
+    def _stop_tracing(self, stage, traced, snapshot):
+        current, peak = tracemalloc.get_traced_memory()
+        stage.traced_growth = (stage.traced_growth or 0) + current - traced
+        if hasattr(tracemalloc, 'reset_peak'):
+            stage.traced_peak = max(stage.traced_peak or 0, peak)
+        if snapshot is not None:
+            differences = self._take_snapshot().compare_to(snapshot,
+                                                           'lineno')
+            stage.top_sites = [
+                (str(difference.traceback[0]), difference.size_diff,
+                 difference.count_diff)
+                for difference in differences[:self.top_sites]
+            ]
+
+    def count_objects(self, label):
+        """Count the live instances of each model class as label."""
+        self.objects[label] = count_objects()
+
+    def to_dict(self):
+        return {
+            'tracemalloc': self.tracing,
+            'max_rss': get_max_rss(),
+            'stages': collections.OrderedDict(
+                (name, {
+                    'traced_growth': stage.traced_growth,
+                    'traced_peak': stage.traced_peak,
+                    'top_sites': [
+                        {'site': site, 'size': size, 'count': count}
+                        for site, size, count in stage.top_sites
+                    ],
+                    'rss_growth': stage.rss_growth,
+                    'objects': stage.objects,
+                })
+                for name, stage in self.stages.items()
+            ),
+            'objects': self.objects,
+        }
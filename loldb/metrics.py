@@ -0,0 +1,193 @@
+"""
+Timers and counters of the work done by a run.
+
+Recording is off until enable is called. While it is off every function
+returns after checking one global, so the instrumented code costs close
+to nothing. Work done in worker processes, with --jobs, is not recorded.
+
+Typical usage:
+    recorder = metrics.enable()
+    with metrics.stage('extract'):
+        ...
+    metrics.count('sql_queries')
+    print(recorder.format_table())
+
+"""
+import collections
+import contextlib
+import os
+import time
+
+try:
+    _cpu_time = time.process_time
+except AttributeError:
+    # Python 2, where clock is the processor time on Unix
+    _cpu_time = time.clock
+_wall_time = getattr(time, 'perf_counter', time.time)
+
+# Recorder of the current run, None while recording is off
+_recorder = None
+
+
+class StageTimes(object):
+    __slots__ = ('calls', 'wall', 'cpu')
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, wall, cpu, calls=1):
+        self.calls += calls
+        self.wall += wall
+        self.cpu += cpu
+
+
+class Recorder(object):
+    """
+    Accumulated stage times and counters.
+
+    Instance variables:
+    stages: Ordered map of stage name to StageTimes, in order of first use
+    counters: Map of counter name to total
+    memory: memory.MemoryRecorder of the stages, or None
+
+    """
+
+    def __init__(self, memory=None):
+        self.stages = collections.OrderedDict()
+        self.counters = collections.defaultdict(int)
+        self.memory = memory
+
+    def add_time(self, name, wall, cpu, calls=1):
+        times = self.stages.get(name)
+        if times is None:
+            times = self.stages[name] = StageTimes()
+        times.add(wall, cpu, calls)
+
+    def _start(self, name):
+        # Memory is measured outside of the timed region
+        memory = None
+        if self.memory is not None:
+            memory = self.memory.start(name)
+        return _wall_time(), _cpu_time(), memory
+
+    def _stop(self, name, start, calls=1):
+        wall, cpu, memory = start
+        self.add_time(name, _wall_time() - wall, _cpu_time() - cpu, calls)
+        if self.memory is not None:
+            self.memory.stop(name, memory)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = self._start(name)
+        try:
+            yield
+        finally:
+            self._stop(name, start)
+
+    def iter_stage(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = self._start(name)
+            try:
+                value = next(iterator)
+            except StopIteration:
+                # Work done after the last value is timed, but is not a call
+                self._stop(name, start, calls=0)
+                return
+            self._stop(name, start)
+            yield value
+
+    def count_rows(self, name, rows):
+        counters = self.counters
+        for row in rows:
+            counters[name] += 1
+            yield row
+
+    def to_dict(self):
+        return {
+            'stages': collections.OrderedDict(
+                (name, {'calls': times.calls, 'wall': times.wall,
+                        'cpu': times.cpu})
+                for name, times in self.stages.items()
+            ),
+            'counters': dict(self.counters),
+        }
+
+    def format_table(self):
+        """Get the stages and counters as a plain text table."""
+        lines = ['{0:<24} {1:>8} {2:>10} {3:>10}'.format(
+            'stage', 'calls', 'wall s', 'cpu s'
+        )]
+        for name, times in self.stages.items():
+            lines.append('{0:<24} {1:>8} {2:>10.3f} {3:>10.3f}'.format(
+                name, times.calls, times.wall, times.cpu
+            ))
+        lines.append('')
+        lines.append('{0:<24} {1:>30}'.format('counter', 'value'))
+        for name, value in sorted(self.counters.items()):
+            lines.append('{0:<24} {1:>30}'.format(name, value))
+        return '\n'.join(lines)
+
+
+def enable(memory=None):
+    """
+    Start recording to a new Recorder, returns it.
+
+    memory is an optional memory.MemoryRecorder to record the memory use
+    of stages to.
+
+    """
+    global _recorder
+    _recorder = Recorder(memory)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+class _NullStage(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Get a context manager that adds its duration to stage name."""
+    if _recorder is None:
+        return _NULL_STAGE
+    return _recorder.stage(name)
+
+
+def iter_stage(name, iterable):
+    """Iterate over iterable, adding the time of each step to stage name."""
+    if _recorder is None:
+        return iterable
+    return _recorder.iter_stage(name, iterable)
+
+
+def count(name, value=1):
+    """Add value to counter name."""
+    if _recorder is not None:
+        _recorder.counters[name] += value
+
+
+def count_rows(name, rows):
+    """Iterate over rows, adding one to counter name for each row."""
+    if _recorder is None:
+        return rows
+    return _recorder.count_rows(name, rows)
+
+
+def count_file_size(name, path):
+    """Add the size of the file at path to counter name."""
+    if _recorder is not None:
+        _recorder.counters[name] += os.path.getsize(path)
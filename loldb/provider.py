@@ -1,11 +1,27 @@
+import atexit
+import bisect
 import collections
+import fnmatch
+import itertools
 import os
 import platform
 import re
+import shutil
 import sqlite3
+import tempfile
+import threading
 
 import raf
 
+from . import metrics
+from .cache import DiskCache
+from .util import alias
+
+try:
+    from urllib import pathname2url
+except ImportError:
+    from urllib.request import pathname2url
+
 
 def _get_highest_version(versions):
     versions = [(v, v.split('.')) for v in versions]
@@ -33,6 +49,49 @@ def _make_re_pattern(token_str, flags=None):
     return re.compile(r'\s*'.join(token_str.split()), flags)
 
 
+def _connect_uri(uri, **kwargs):
+    """Connect to a sqlite URI, or return None if URIs are unsupported."""
+    try:
+        return sqlite3.connect(uri, uri=True, **kwargs)
+    except TypeError:
+        # The uri argument requires Python 3.4
+        return None
+
+
+def _sql_alias(s):
+    """util.alias for use in SQL queries as loldb_alias."""
+    if s is None:
+        return None
+    return alias(s)
+
+
+def _copy_db(source, target):
+    """Copy the contents of one sqlite connection into another."""
+    if hasattr(source, 'backup'):
+        source.backup(target)
+    else:
+        # The backup API requires Python 3.7
+        target.executescript('\n'.join(source.iterdump()))
+
+
+_snapshot_ids = itertools.count()
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_entry(entry):
+    """Get the decompressed data of a RAF entry."""
+    data = entry.read()
+    metrics.count('raf_bytes_read', entry.size)
+    metrics.count('raf_bytes_decompressed', len(data))
+    return data
+
+
 def _build_path(
         base_path,
         project="lol_air_client",
@@ -56,16 +115,124 @@ def _build_path(
     return os.path.join(*path)
 
 
+class RAFIndex(object):
+    """
+    Path index over the most recent version of every RAF entry.
+
+    Paths are normalized to lowercase, as RAF lookups are case-insensitive.
+    Supports exact, prefix and glob lookups without scanning every entry.
+
+    """
+
+    def __init__(self, raf_master):
+        self.entries = {}
+        self._archives = {}
+        # Archives are sorted by version, so later archives take precedence
+        for archive in raf_master.archives:
+            for path, entry in archive.entries_by_path().items():
+                path = path.lower()
+                self.entries[path] = entry
+                self._archives[path] = archive
+        self._paths = sorted(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path.lower() in self.entries
+
+    def find(self, path):
+        """Get the entry for path, or None if it does not exist."""
+        # Not counted in __contains__, which usually precedes a find
+        metrics.count('raf_lookups')
+        return self.entries.get(path.lower())
+
+    def read(self, path):
+        """Get the decompressed data of path, or None if it does not exist."""
+        entry = self.find(path)
+        if entry is None:
+            return None
+        return _read_entry(entry)
+
+    def fingerprint(self, path):
+        """
+        Get a tuple identifying the current contents of path.
+
+        The tuple is (archive path, entry offset, entry size, archive
+        version), or None if path does not exist.
+
+        """
+        path = path.lower()
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        archive_path = self._archives[path].path
+        version = os.path.basename(os.path.dirname(archive_path))
+        return (archive_path, entry.offset, entry.size, version)
+
+    def _paths_with_prefix(self, prefix):
+        start = bisect.bisect_left(self._paths, prefix)
+        for path in self._paths[start:]:
+            if not path.startswith(prefix):
+                break
+            yield path
+
+    def find_prefix(self, prefix):
+        """Generate entries whose path starts with prefix."""
+        for path in self._paths_with_prefix(prefix.lower()):
+            yield self.entries[path]
+
+    def find_glob(self, pattern):
+        """Generate entries whose path matches a shell-style pattern."""
+        pattern = pattern.lower()
+        # Only paths sharing the literal prefix of the pattern can match
+        prefix = re.split(r'[*?[]', pattern, 1)[0]
+        for path in self._paths_with_prefix(prefix):
+            if fnmatch.fnmatchcase(path, pattern):
+                yield self.entries[path]
+
+
 class ResourceProvider(object):
-    def __init__(self, lol_path=None, language=None):
+    FONT_CONFIG_NAME = 'fontconfig_en_US.txt'
+    # Bytes of a read-only gameStats database to memory-map
+    MMAP_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, lol_path=None, language=None, cache_path=None,
+                 cache_size=None, read_only=False, snapshot=False):
+        """
+        cache_path is a directory to cache parsed inibins in. If None,
+        inibins are parsed on every run. cache_size is the maximum size of
+        the cache in bytes.
+
+        If read_only is True, gameStats is opened read-only and immutable
+        with memory-mapped I/O, so a running client is never locked. Where
+        sqlite URIs are unsupported (Python 2) a private copy of gameStats
+        is opened instead, to the same effect. If
+        snapshot is True, gameStats is read once into an in-memory
+        database that every connection uses, this implies read_only.
+
+        """
         if lol_path is None:
             lol_path = self._get_default_path()
         if language is None:
             language = 'en_US'
         self.base_path = lol_path
         self.language = language
-        self.db = None
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.read_only = read_only or snapshot
+        self.snapshot = snapshot
+        # Connections are per-thread
+        self._db_local = threading.local()
+        self._snapshot_db = None
+        self._snapshot_uri = None
+        self._snapshot_lock = threading.Lock()
+        self._read_only_copy = None
+        self._read_only_copy_lock = threading.Lock()
+        self._row_classes = {}
         self.raf = None
+        self.raf_index = None
+        self.inibin_cache = None
         self.font_config = None
 
     def _get_default_path(self):
@@ -82,42 +249,172 @@ class ResourceProvider(object):
         )
 
     def get_db(self):
-        """Get connection to gameStats database."""
-        if self.db is None:
-            self.db = sqlite3.connect(self._get_db_path())
-        return self.db
-
-    def get_db_query(self, query):
-        """Get the rows from a gameStats database query."""
+        """Get this thread's connection to gameStats database."""
+        db = getattr(self._db_local, 'db', None)
+        if db is None:
+            if self.snapshot:
+                db = self._connect_snapshot_db()
+            elif self.read_only:
+                db = self._connect_read_only_db()
+            else:
+                db = sqlite3.connect(self._get_db_path())
+            db.create_function('loldb_alias', 1, _sql_alias)
+            self._db_local.db = db
+        return db
+
+    def _connect_read_only_db(self):
+        path = os.path.abspath(self._get_db_path())
+        uri = 'file:%s?mode=ro&immutable=1' % pathname2url(path)
+        db = _connect_uri(uri)
+        if db is None:
+            # A plain connection takes locks and creates a missing file
+            db = sqlite3.connect(self._get_read_only_copy(path))
+            db.execute('PRAGMA query_only = 1')
+        db.execute('PRAGMA mmap_size = %d' % self.MMAP_SIZE)
+        return db
+
+    def _get_read_only_copy(self, path):
+        """Get the path of a copy of gameStats, copied once per provider."""
+        with self._read_only_copy_lock:
+            if self._read_only_copy is None:
+                fd, copy_path = tempfile.mkstemp(suffix='.sqlite')
+                os.close(fd)
+                try:
+                    shutil.copyfile(path, copy_path)
+                except Exception:
+                    _remove_file(copy_path)
+                    raise
+                atexit.register(_remove_file, copy_path)
+                self._read_only_copy = copy_path
+            return self._read_only_copy
+
+    def _connect_snapshot_db(self):
+        """
+        Connect to the in-memory snapshot, creating it if needed.
+
+        The snapshot is a shared-cache memory database that each thread
+        connects to. Where URIs are unsupported, each thread gets its own
+        copy of the snapshot instead. Either way the install is read once.
+
+        """
+        with self._snapshot_lock:
+            if self._snapshot_db is None:
+                uri = 'file:loldb_snapshot_%d?mode=memory&cache=shared' % (
+                    next(_snapshot_ids)
+                )
+                snapshot_db = _connect_uri(uri, check_same_thread=False)
+                if snapshot_db is None:
+                    uri = None
+                    snapshot_db = sqlite3.connect(
+                        ':memory:',
+                        check_same_thread=False
+                    )
+                source = self._connect_read_only_db()
+                _copy_db(source, snapshot_db)
+                source.close()
+                # Keeps a shared-cache database alive between connections
+                self._snapshot_db = snapshot_db
+                self._snapshot_uri = uri
+
+            if self._snapshot_uri is not None:
+                return _connect_uri(self._snapshot_uri)
+            db = sqlite3.connect(':memory:')
+            _copy_db(self._snapshot_db, db)
+            return db
+
+    def _get_row_class(self, key, columns):
+        """Get namedtuple class for rows with columns, created once per key."""
+        row_class = self._row_classes.get(key)
+        if row_class is None:
+            row_class = collections.namedtuple('Row', columns)
+            self._row_classes[key] = row_class
+        return row_class
+
+    def get_db_query(self, query, parameters=()):
+        """
+        Get the rows from a gameStats database query.
+
+        Values in parameters are bound to the ? placeholders in query.
+
+        """
         connection = self.get_db()
         cursor = connection.cursor()
         # execute doesn't accept a parametrized table name
-        rows = cursor.execute(query)
+        rows = cursor.execute(query, parameters)
+        metrics.count('sql_queries')
+        rows = metrics.count_rows('sql_rows', rows)
 
         # Get column names from cursor
-        columns = [c[0] for c in cursor.description]
-        row_class = collections.namedtuple('Row', columns)
+        columns = tuple(c[0] for c in cursor.description)
+        row_class = self._get_row_class(columns, columns)
 
         for row in rows:
-            row = row_class(*row)
+            row = row_class._make(row)
             yield row
 
     def get_db_rows(self, table):
         """Get the rows from a gameStats database table."""
         return self.get_db_query("SELECT * FROM `%s`" % table)
 
+    def get_db_select(self, table, columns, where=None, parameters=(),
+                      named=True):
+        """
+        Get only the given columns from the rows of a gameStats table.
+
+        where is an optional condition, with values in parameters bound to
+        its ? placeholders. If named is True, rows are namedtuples whose
+        class is created once per table and columns. Otherwise rows are
+        plain tuples in the order of columns.
+
+        """
+        columns = tuple(columns)
+        query = 'SELECT %s FROM `%s`' % (
+            ', '.join('`%s`' % column for column in columns),
+            table,
+        )
+        if where:
+            query += ' WHERE %s' % where
+
+        cursor = self.get_db().cursor()
+        rows = cursor.execute(query, parameters)
+        metrics.count('sql_queries')
+        rows = metrics.count_rows('sql_rows', rows)
+        if not named:
+            return rows
+        row_class = self._get_row_class((table, columns), columns)
+        return (row_class._make(row) for row in rows)
+
     def get_raf_master(self):
         """Get RAFMaster instance for game client."""
         if self.raf is None:
             self.raf = raf.RAFMaster(self._get_raf_path())
         return self.raf
 
+    def get_raf_index(self):
+        """Get RAFIndex of all paths in the game client archives."""
+        if self.raf_index is None:
+            self.raf_index = RAFIndex(self.get_raf_master())
+        return self.raf_index
+
+    def get_inibin_cache(self):
+        """Get DiskCache for parsed inibins, or None if disabled."""
+        if self.inibin_cache is None and self.cache_path is not None:
+            self.inibin_cache = DiskCache(self.cache_path, self.cache_size)
+        return self.inibin_cache
+
+    def get_font_config_fingerprint(self):
+        """Get RAFIndex fingerprint of the font_config source file."""
+        entry = self.get_raf_master().find(name=self.FONT_CONFIG_NAME)
+        return self.get_raf_index().fingerprint(entry.path)
+
     def get_font_config(self):
         """Get font_config dictionary."""
         if self.font_config is None:
             archive = self.get_raf_master()
             font_config = {}
-            font_config_text = archive.find(name='fontconfig_en_US.txt').read()
+            font_config_text = _read_entry(
+                archive.find(name=self.FONT_CONFIG_NAME)
+            )
             font_config_re = _make_re_pattern('^ tr "([^"]+)" = "(.+)" $', re.M)
             for match in font_config_re.finditer(font_config_text):
                 font_config[match.group(1)] = match.group(2)
@@ -149,6 +446,20 @@ class WindowsResourceProvider(ResourceProvider):
         )
 
 
+class LinuxResourceProvider(WindowsResourceProvider):
+    """
+    Provider for installations with the Windows layout on Linux.
+
+    These are installations under Wine or generated by loldb.fixture.
+
+    """
+
+    def _get_default_path(self):
+        return os.path.expanduser(
+            '~/.wine/drive_c/Riot Games/League of Legends/'
+        )
+
+
 def get_provider_class(system=None):
     if system is None:
         system = platform.system()
@@ -156,11 +467,15 @@ def get_provider_class(system=None):
             system = 'win'
         elif system == 'Darwin':
             system = 'mac'
+        elif system == 'Linux':
+            system = 'linux'
         else:
             system = None
     if system == 'win':
         return WindowsResourceProvider
     elif system == 'mac':
         return MacResourceProvider
+    elif system == 'linux':
+        return LinuxResourceProvider
     else:
         raise RuntimeError('Unable to determine operating system.')
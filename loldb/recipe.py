@@ -0,0 +1,190 @@
+import collections
+import warnings
+
+
+class RecipeGraph(object):
+    """
+    Index of the item recipe graph.
+
+    Every item is a node with an edge to each component in its recipe.
+    Transitive components, total costs and build paths are computed once,
+    in topological order, so each query is a lookup.
+
+    A component needed more than once is counted once per copy, in total
+    costs and build paths. Components that would make an item part of its
+    own recipe are ignored, with a warning.
+
+    Instance variables:
+    order: List of item ids, every item after all of its components
+
+    """
+
+    def __init__(self, costs, recipes):
+        """
+        costs is a map of item id to combine cost, the cost of the item
+        excluding its components. recipes is a map of item id to a list of
+        the ids of its direct components, repeated for each copy needed.
+
+        """
+        self._costs = dict(costs)
+        # Missing components are already reported by get_items
+        components = dict(
+            (id, collections.Counter(component for component in
+                                     recipes.get(id, ())
+                                     if component in self._costs))
+            for id in self._costs
+        )
+        self._remove_cycles(components)
+        self._component_counts = components
+        self._components = {}
+        builds_into = collections.defaultdict(set)
+        for id, item_components in components.items():
+            for component in item_components:
+                builds_into[component].add(id)
+            self._components[id] = frozenset(item_components)
+        self._builds_into = dict((id, frozenset(builds_into[id]))
+                                 for id in self._costs)
+
+        self.order = self._sort()
+        self._all_components = {}
+        self._total_costs = {}
+        self._build_paths = {}
+        for id in self.order:
+            components = self._components[id]
+            all_components = set(components)
+            total_cost = self._costs[id]
+            build_paths = []
+            counts = self._component_counts[id]
+            for component in sorted(components):
+                all_components.update(self._all_components[component])
+                total_cost += self._total_costs[component] * counts[component]
+                build_paths.extend(path + (id,) for path in
+                                   self._build_paths[component]
+                                   for _ in range(counts[component]))
+            self._all_components[id] = frozenset(all_components)
+            self._total_costs[id] = total_cost
+            self._build_paths[id] = tuple(build_paths) or ((id,),)
+
+    @staticmethod
+    def _remove_cycles(components):
+        """
+        Remove the components closing a cycle from a map of item id to
+        Counter of component ids, warning about each.
+
+        """
+        # Items being visited are True, visited items are False
+        visiting = {}
+        for root in sorted(components):
+            if root in visiting:
+                continue
+            visiting[root] = True
+            stack = [(root, iter(sorted(components[root])))]
+            while stack:
+                id, remaining = stack[-1]
+                for component in remaining:
+                    if visiting.get(component):
+                        warnings.warn('Ignoring recipe cycle: item %s is '
+                                      'built from item %s' % (id, component))
+                        del components[id][component]
+                    elif component not in visiting:
+                        visiting[component] = True
+                        stack.append((component,
+                                      iter(sorted(components[component]))))
+                        break
+                else:
+                    visiting[id] = False
+                    stack.pop()
+
+    def _sort(self):
+        """Sort item ids topologically, every item after its components."""
+        remaining = dict((id, len(components))
+                         for id, components in self._components.items())
+        ready = sorted(id for id, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            id = ready.pop()
+            order.append(id)
+            for result in self._builds_into[id]:
+                remaining[result] -= 1
+                if remaining[result] == 0:
+                    ready.append(result)
+        return order
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Build graph from Items, such as the values of get_items.
+
+        Item.recipe is a set, use get_recipe_graph to count components
+        needed more than once.
+
+        """
+        items = list(items)
+        return cls(
+            dict((item.id, item.cost) for item in items),
+            dict((item.id, item.recipe) for item in items),
+        )
+
+    def __contains__(self, id):
+        return id in self._costs
+
+    def __len__(self):
+        return len(self._costs)
+
+    def get_components(self, id):
+        """Get the set of ids in the recipe of an item."""
+        return self._components[id]
+
+    def get_component_count(self, id, component):
+        """Get the number of copies of component in the recipe of an item."""
+        return self._component_counts[id][component]
+
+    def get_all_components(self, id):
+        """Get the set of ids of every item needed to build an item."""
+        return self._all_components[id]
+
+    def get_builds_into(self, id):
+        """Get the set of ids of items with an item in their recipe."""
+        return self._builds_into[id]
+
+    def get_combine_cost(self, id):
+        """Get the cost of an item, excluding its components."""
+        return self._costs[id]
+
+    def get_total_cost(self, id):
+        """Get the cost of an item, including all of its components."""
+        return self._total_costs[id]
+
+    def get_build_paths(self, id):
+        """
+        Get every path through the graph that ends at an item.
+
+        Paths are tuples of item ids starting at an item without a recipe,
+        each item being a component of the next.
+
+        """
+        return self._build_paths[id]
+
+    def get_signature(self, id):
+        """Get a deterministic tuple of everything derived for an item."""
+        return (
+            self._total_costs[id],
+            sorted(self._all_components[id]),
+            sorted(self._builds_into[id]),
+            self._build_paths[id],
+        )
+
+
+def get_recipe_graph(provider):
+    """Build RecipeGraph of every item in the database."""
+    costs = dict(provider.get_db_select('items', ('id', 'price'),
+                                        named=False))
+    recipes = collections.defaultdict(list)
+    rows = provider.get_db_select(
+        'itemRecipes',
+        ('buildsToItemId', 'recipeItemId'),
+        named=False,
+    )
+    for result, component in rows:
+        recipes[result].append(component)
+    return RecipeGraph(costs, recipes)
@@ -1,14 +1,24 @@
 class Skin(object):
-    id = -1
-    name = ''
-    portrait_path = ''
-    splash_path = ''
-    is_base = False
-    champion_id = -1
-    rank = -1
+    __slots__ = (
+        'id',
+        'name',
+        'internal_name',
+        'portrait_path',
+        'splash_path',
+        'is_base',
+        'champion_id',
+        'rank',
+    )
 
     def __init__(self, internal_name):
+        self.id = -1
+        self.name = ''
         self.internal_name = internal_name
+        self.portrait_path = ''
+        self.splash_path = ''
+        self.is_base = False
+        self.champion_id = -1
+        self.rank = -1
 
     def __lt__(self, other):
         return self.rank < other.rank
@@ -17,6 +27,18 @@ class Skin(object):
         return "<Skin %s '%s'>" % (self.id, self.name)
 
 
+_SKIN_COLUMNS = (
+    'id',
+    'name',
+    'displayName',
+    'portraitPath',
+    'splashPath',
+    'isBase',
+    'championId',
+    'rank',
+)
+
+
 def _make_skin_from_sql_row(row):
     skin = Skin(row.name)
     skin.id = row.id
@@ -30,11 +52,53 @@ def _make_skin_from_sql_row(row):
 
 
 def get_skins(provider):
-    for row in provider.get_db_rows('championSkins'):
+    for row in provider.get_db_select('championSkins', _SKIN_COLUMNS):
         yield _make_skin_from_sql_row(row)
 
 
 def get_skins_for_champion(provider, champion_id):
-    query = "SELECT * FROM `championSkins` WHERE championId = %s" % champion_id
-    for row in provider.get_db_query(query):
+    rows = provider.get_db_select(
+        'championSkins',
+        _SKIN_COLUMNS,
+        where='championId = ?',
+        parameters=(champion_id,),
+    )
+    for row in rows:
         yield _make_skin_from_sql_row(row)
+
+
+# Stay below the SQLite limit on the number of query parameters
+_MAX_PARAMETERS = 500
+
+
+def _get_skins_for_champions(provider, champion_ids):
+    for i in range(0, len(champion_ids), _MAX_PARAMETERS):
+        chunk = champion_ids[i:i + _MAX_PARAMETERS]
+        rows = provider.get_db_select(
+            'championSkins',
+            _SKIN_COLUMNS,
+            where='championId IN (%s)' % ', '.join('?' * len(chunk)),
+            parameters=tuple(chunk),
+        )
+        for row in rows:
+            yield _make_skin_from_sql_row(row)
+
+
+def get_skins_by_champion(provider, champion_ids=None):
+    """
+    Return map of champion ids to lists of their Skins, sorted by rank.
+
+    Reads the championSkins table once for every champion, or only the
+    rows for champion_ids if given.
+
+    """
+    if champion_ids is None:
+        all_skins = get_skins(provider)
+    else:
+        all_skins = _get_skins_for_champions(provider, list(champion_ids))
+    skins = {}
+    for skin in all_skins:
+        skins.setdefault(skin.champion_id, []).append(skin)
+    for champion_skins in skins.values():
+        champion_skins.sort()
+    return skins
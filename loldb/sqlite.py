@@ -0,0 +1,270 @@
+import json
+import numbers
+import os
+import sqlite3
+
+from .convert import Encoder
+
+# Tables are created without indexes, only rowid aliases, so rows are
+# appended during the load. Indexes are created once it is done.
+SCHEMA = '''
+CREATE TABLE champions (
+    id INTEGER PRIMARY KEY,
+    internal_name TEXT,
+    name TEXT,
+    alias TEXT,
+    title TEXT,
+    icon_path TEXT,
+    select_sound_path TEXT,
+    tags TEXT,
+    tips_as TEXT,
+    tips_against TEXT,
+    lore_body TEXT,
+    lore_quote TEXT,
+    lore_quote_author TEXT,
+    rating_attack INTEGER,
+    rating_defense INTEGER,
+    rating_magic INTEGER,
+    rating_difficulty INTEGER
+);
+CREATE TABLE champion_stats (
+    champion_id INTEGER,
+    stat TEXT,
+    base REAL,
+    per_level REAL
+);
+CREATE TABLE abilities (
+    id INTEGER PRIMARY KEY,
+    champion_id INTEGER,
+    position INTEGER,
+    name TEXT,
+    description TEXT,
+    key TEXT,
+    tooltip TEXT
+);
+CREATE TABLE ability_levels (
+    ability_id INTEGER,
+    level INTEGER,
+    cooldown REAL,
+    cost REAL
+);
+CREATE TABLE tooltip_values (
+    ability_id INTEGER,
+    level INTEGER,
+    key TEXT,
+    value
+);
+CREATE TABLE skins (
+    id INTEGER PRIMARY KEY,
+    champion_id INTEGER,
+    name TEXT,
+    internal_name TEXT,
+    portrait_path TEXT,
+    splash_path TEXT,
+    is_base INTEGER,
+    rank INTEGER
+);
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    alias TEXT,
+    icon_path TEXT,
+    cost INTEGER,
+    total_cost INTEGER,
+    tooltip TEXT,
+    tier INTEGER
+);
+CREATE TABLE item_stats (
+    item_id INTEGER,
+    stat TEXT,
+    flat REAL,
+    percentage REAL
+);
+CREATE TABLE item_categories (
+    item_id INTEGER,
+    category TEXT
+);
+CREATE TABLE item_recipes (
+    item_id INTEGER,
+    component_id INTEGER
+);
+'''
+
+INDEXES = '''
+CREATE UNIQUE INDEX champions_internal_name ON champions (internal_name);
+CREATE INDEX champions_alias ON champions (alias);
+CREATE INDEX champions_name ON champions (name COLLATE NOCASE);
+CREATE UNIQUE INDEX champion_stats_champion_id
+    ON champion_stats (champion_id, stat);
+CREATE INDEX abilities_champion_id ON abilities (champion_id, position);
+CREATE UNIQUE INDEX ability_levels_ability_id
+    ON ability_levels (ability_id, level);
+CREATE INDEX tooltip_values_ability_id
+    ON tooltip_values (ability_id, level);
+CREATE INDEX skins_champion_id ON skins (champion_id);
+CREATE INDEX items_alias ON items (alias);
+CREATE INDEX items_name ON items (name COLLATE NOCASE);
+CREATE UNIQUE INDEX item_stats_item_id ON item_stats (item_id, stat);
+CREATE INDEX item_categories_item_id ON item_categories (item_id);
+CREATE INDEX item_categories_category ON item_categories (category);
+CREATE INDEX item_recipes_item_id ON item_recipes (item_id);
+CREATE INDEX item_recipes_component_id ON item_recipes (component_id);
+'''
+
+
+def _to_json(value):
+    return json.dumps(value, cls=Encoder)
+
+
+def _to_sql_value(value):
+    """Store numbers and strings as is, anything else as json."""
+    if value is None or isinstance(value, (numbers.Number, type(u''), str)):
+        return value
+    return _to_json(value)
+
+
+def _insert(db, table, rows):
+    if not rows:
+        return
+    db.executemany(
+        'INSERT INTO %s VALUES (%s)' % (table, ', '.join('?' * len(rows[0]))),
+        rows
+    )
+
+
+class _Rows(object):
+    """Rows of every table, gathered in one pass over the records."""
+
+    def __init__(self):
+        self.tables = dict((table, []) for table in (
+            'champions', 'champion_stats', 'abilities', 'ability_levels',
+            'tooltip_values', 'skins', 'items', 'item_stats',
+            'item_categories', 'item_recipes',
+        ))
+        self._ability_id = 0
+
+    def add_champion(self, champion):
+        tables = self.tables
+        id = champion['id']
+        lore = champion['lore']
+        ratings = champion['ratings']
+        tables['champions'].append((
+            id,
+            champion['internal_name'],
+            champion['name'],
+            champion['alias'],
+            champion['title'],
+            champion['icon_path'],
+            champion['select_sound_path'],
+            ','.join(sorted(champion['tags'])),
+            _to_json(champion['tips_as']),
+            _to_json(champion['tips_against']),
+            lore['body'],
+            lore['quote'],
+            lore['quote_author'],
+            ratings['attack'],
+            ratings['defense'],
+            ratings['magic'],
+            ratings['difficulty'],
+        ))
+        for name, stat in sorted(champion['stats'].items()):
+            if isinstance(stat, dict):
+                base, per_level = stat['base'], stat['per_level']
+            else:
+                base, per_level = stat, 0
+            tables['champion_stats'].append((id, name, base, per_level))
+        for position, ability in enumerate(champion['abilities']):
+            self._add_ability(id, position, ability)
+        for skin in champion['skins']:
+            tables['skins'].append((
+                skin['id'],
+                id,
+                skin['name'],
+                skin['internal_name'],
+                skin['portrait_path'],
+                skin['splash_path'],
+                skin['is_base'],
+                skin['rank'],
+            ))
+
+    def _add_ability(self, champion_id, position, ability):
+        tables = self.tables
+        self._ability_id += 1
+        ability_id = self._ability_id
+        tables['abilities'].append((
+            ability_id,
+            champion_id,
+            position,
+            ability['name'],
+            ability['description'],
+            ability['key'],
+            ability['tooltip'],
+        ))
+        for level, values in enumerate(ability['levels'], 1):
+            tables['ability_levels'].append((
+                ability_id,
+                level,
+                _to_sql_value(values['cooldown']),
+                _to_sql_value(values['cost']),
+            ))
+            for key, value in sorted(values['tooltip_values'].items()):
+                tables['tooltip_values'].append(
+                    (ability_id, level, key, _to_sql_value(value))
+                )
+
+    def add_item(self, item):
+        tables = self.tables
+        id = item['id']
+        tables['items'].append((
+            id,
+            item['name'],
+            item['alias'],
+            item['icon_path'],
+            item['cost'],
+            item.get('total_cost'),
+            item['tooltip'],
+            item['tier'],
+        ))
+        for name, stat in sorted(item['stats'].items()):
+            tables['item_stats'].append(
+                (id, name, stat['flat'], stat['percentage'])
+            )
+        for category in sorted(item['categories']):
+            tables['item_categories'].append((id, category))
+        for component_id in sorted(item['recipe']):
+            tables['item_recipes'].append((id, component_id))
+
+
+def write_sqlite(path, champions, items):
+    """
+    Write formatted champions and items to a new sqlite database at path.
+
+    Any existing file at path is replaced. All rows are inserted in one
+    transaction, then the indexes are created. items may be a mapping or
+    an iterable of (id, item) pairs.
+
+    """
+    if hasattr(items, 'items'):
+        items = items.items()
+    rows = _Rows()
+    for champion in champions:
+        rows.add_champion(champion)
+    for _, item in items:
+        rows.add_item(item)
+
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path)
+    try:
+        # The file is only usable once it is complete, so it is not
+        # journaled or synced while it is written
+        db.execute('PRAGMA journal_mode = OFF')
+        db.execute('PRAGMA synchronous = OFF')
+        db.executescript(SCHEMA)
+        with db:
+            for table, table_rows in rows.tables.items():
+                _insert(db, table, table_rows)
+        db.executescript(INDEXES)
+        db.commit()
+    finally:
+        db.close()
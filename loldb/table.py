@@ -0,0 +1,275 @@
+"""
+Columnar tables of champion and item stats for analysis with NumPy.
+
+NumPy is optional, it is only required to build or load tables.
+
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .champion import ChampionStats
+from .convert import format_champion_stats, format_item_stats
+from .item import ItemStats
+
+AVAILABLE = numpy is not None
+
+STATS = ChampionStats._STATS
+
+MAX_LEVEL = 18
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('NumPy is required for stat tables')
+
+
+def _split_stat(stat):
+    """Get (base, per_level) of a stat, scalar stats do not grow."""
+    if isinstance(stat, dict):
+        return stat['base'], stat['per_level']
+    return stat, 0
+
+
+class ChampionStatTable(object):
+    """
+    Base and per level values of every stat, one row per champion.
+
+    Rows are sorted by champion id and columns are in STATS order. Stats
+    that do not grow with level (range and speed) have a per level value
+    of 0.
+
+    Instance variables:
+    ids: Array of champion ids
+    base: Array of base values, shape (champions, stats)
+    per_level: Array of per level values, shape (champions, stats)
+
+    """
+    stats = STATS
+
+    def __init__(self, ids, base, per_level):
+        _require_numpy()
+        ids = numpy.asarray(ids, dtype=numpy.int64).reshape(-1)
+        shape = (len(ids), len(self.stats))
+        order = numpy.argsort(ids, kind='mergesort')
+        self.ids = ids[order]
+        self.base = numpy.asarray(base, dtype=numpy.float64).reshape(shape)
+        self.base = self.base[order]
+        self.per_level = numpy.asarray(per_level, dtype=numpy.float64)
+        self.per_level = self.per_level.reshape(shape)[order]
+        self._rows = dict((id, i) for i, id in enumerate(self.ids.tolist()))
+        if len(self._rows) != len(ids):
+            raise ValueError('Duplicate champion id in stat table')
+
+    @classmethod
+    def from_records(cls, records):
+        """Build table from champions formatted by format_champion."""
+        ids, base, per_level = [], [], []
+        for record in records:
+            ids.append(record['id'])
+            stats = record['stats']
+            values = [_split_stat(stats[name]) for name in cls.stats]
+            base.append([value for value, _ in values])
+            per_level.append([value for _, value in values])
+        return cls(ids, base, per_level)
+
+    @classmethod
+    def from_champions(cls, champions):
+        """Build table from Champions."""
+        return cls.from_records(
+            {
+                'id': champion.id,
+                'stats': format_champion_stats(champion.stats),
+            }
+            for champion in champions
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id):
+        return id in self._rows
+
+    def get_index(self, id):
+        """Get the row of a champion id, raises KeyError if missing."""
+        return self._rows[id]
+
+    def get_stat_index(self, name):
+        """Get the column of a stat name, raises KeyError if missing."""
+        try:
+            return self.stats.index(name)
+        except ValueError:
+            raise KeyError(name)
+
+    def get_stat(self, name):
+        """Get (base, per_level) columns of a stat for every champion."""
+        column = self.get_stat_index(name)
+        return self.base[:, column], self.per_level[:, column]
+
+    def get_champion(self, id):
+        """Get (base, per_level) rows of every stat for a champion id."""
+        row = self.get_index(id)
+        return self.base[row], self.per_level[row]
+
+    def get_stats_at_levels(self, levels=None):
+        """
+        Get every stat of every champion at each of levels.
+
+        Levels default to 1 through MAX_LEVEL. Returns an array of shape
+        (champions, levels, stats).
+
+        Bases from inibins do not include the level one bonus, so most
+        stats are base + per_level * level. Attack speed bases do, and its
+        per level value is a fraction of the base, so attack speed is
+        base * (1 + per_level * (level - 1)).
+
+        """
+        if levels is None:
+            levels = numpy.arange(1, MAX_LEVEL + 1)
+        levels = numpy.asarray(levels, dtype=numpy.float64)
+        base = self.base[:, numpy.newaxis, :]
+        per_level = self.per_level[:, numpy.newaxis, :]
+        values = base + per_level * levels[:, numpy.newaxis]
+
+        column = self.get_stat_index('attack_speed')
+        values[:, :, column] = base[:, :, column] * (
+            1 + per_level[:, :, column] * (levels - 1)
+        )
+        return values
+
+    def save(self, f, include_levels=False):
+        """
+        Save table to a path or file as an uncompressed .npz.
+
+        If include_levels is set, the output of get_stats_at_levels is
+        saved as stats_at_levels, with its levels as levels.
+
+        """
+        arrays = {
+            'ids': self.ids,
+            'base': self.base,
+            'per_level': self.per_level,
+            'stats': numpy.array(self.stats),
+        }
+        if include_levels:
+            arrays['levels'] = numpy.arange(1, MAX_LEVEL + 1)
+            arrays['stats_at_levels'] = self.get_stats_at_levels()
+        numpy.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, f):
+        """Load table saved to a path or file."""
+        _require_numpy()
+        with numpy.load(f) as data:
+            stats = tuple(str(name) for name in data['stats'])
+            if stats != cls.stats:
+                raise ValueError('Stat table has columns %s, expected %s' %
+                                 (stats, cls.stats))
+            return cls(data['ids'], data['base'], data['per_level'])
+
+
+ITEM_STATS = tuple(name for name, _ in ItemStats.STATS_TABLE)
+
+
+class ItemStatTable(object):
+    """
+    Flat and percentage values of every stat, one row per item.
+
+    Rows are sorted by item id and columns are in ITEM_STATS order.
+
+    Instance variables:
+    ids: Array of item ids
+    flat: Array of flat values, shape (items, stats)
+    percentage: Array of percentage values, shape (items, stats)
+
+    """
+    stats = ITEM_STATS
+
+    def __init__(self, ids, flat, percentage):
+        _require_numpy()
+        ids = numpy.asarray(ids, dtype=numpy.int64).reshape(-1)
+        shape = (len(ids), len(self.stats))
+        order = numpy.argsort(ids, kind='mergesort')
+        self.ids = ids[order]
+        if len(numpy.unique(self.ids)) != len(self.ids):
+            raise ValueError('Duplicate item id in stat table')
+        # A row of zeros is kept after the items, so index -1 is no item
+        self._flat = numpy.zeros((len(ids) + 1, len(self.stats)))
+        self._flat[:-1] = numpy.asarray(flat).reshape(shape)[order]
+        self._percentage = numpy.zeros((len(ids) + 1, len(self.stats)))
+        self._percentage[:-1] = numpy.asarray(percentage).reshape(shape)[order]
+        self.flat = self._flat[:-1]
+        self.percentage = self._percentage[:-1]
+
+    @classmethod
+    def from_records(cls, records):
+        """Build table from values of items formatted by format_item."""
+        ids, flat, percentage = [], [], []
+        for record in records:
+            ids.append(record['id'])
+            stats = record['stats']
+            flat.append([stats[name]['flat'] for name in cls.stats])
+            percentage.append([stats[name]['percentage']
+                               for name in cls.stats])
+        return cls(ids, flat, percentage)
+
+    @classmethod
+    def from_items(cls, items):
+        """Build table from Items, such as the values of get_items."""
+        return cls.from_records(
+            {'id': item.id, 'stats': format_item_stats(item.stats)}
+            for item in items
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get_stat_index(self, name):
+        """Get the column of a stat name, raises KeyError if missing."""
+        try:
+            return self.stats.index(name)
+        except ValueError:
+            raise KeyError(name)
+
+    def get_indices(self, ids):
+        """
+        Convert an array of item ids to an array of rows.
+
+        Ids of -1 become row -1, which is no item. Raises KeyError if an
+        id is missing.
+
+        """
+        ids = numpy.asarray(ids, dtype=numpy.int64)
+        rows = numpy.searchsorted(self.ids, ids)
+        found = rows < len(self.ids)
+        found[found] = self.ids[rows[found]] == ids[found]
+        empty = ids == -1
+        missing = ~found & ~empty
+        if missing.any():
+            raise KeyError(int(ids[missing][0]))
+        rows[empty] = -1
+        return rows
+
+    def get_build_stats(self, builds):
+        """
+        Sum the stats of the items in each build.
+
+        builds is an array of rows from get_indices with shape (builds,
+        slots), where row -1 is an empty slot. Returns flat and percentage
+        arrays with shape (builds, stats).
+
+        """
+        builds = numpy.asarray(builds, dtype=numpy.intp)
+        shape = (len(builds), len(self.stats))
+        if not len(builds):
+            # The slot count of an empty array cannot be inferred
+            return numpy.zeros(shape), numpy.zeros(shape)
+        builds = builds.reshape(len(builds), -1)
+        flat = numpy.zeros(shape)
+        percentage = numpy.zeros(shape)
+        # Summing one slot at a time avoids a (builds, slots, stats) copy
+        for slot in range(builds.shape[1]):
+            flat += self._flat[builds[:, slot]]
+            percentage += self._percentage[builds[:, slot]]
+        return flat, percentage
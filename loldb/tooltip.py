@@ -0,0 +1,137 @@
+import re
+
+from . import metrics
+
+try:
+    from html import unescape as _unescape
+except ImportError:
+    from HTMLParser import HTMLParser
+    _unescape = HTMLParser().unescape
+
+
+# Token types
+TEXT = 'text'
+START = 'start'
+END = 'end'
+
+# Tags in game tooltips are simple, attributes are ignored
+_TAG_RE = re.compile(r'<\s*(/?)\s*([a-zA-Z][\w-]*)[^>]*?(/?)\s*>')
+
+# Tags that never have content
+_VOID_TAGS = frozenset(['br'])
+
+
+def tokenize(tooltip):
+    """
+    Generate (type, value) tokens for tooltip html in a single pass.
+
+    Types are TEXT, START and END. Text values have entities decoded, tag
+    values are lowercase tag names. Void tags such as <br> only generate
+    a START token, other self-closing tags such as <stats/> generate a
+    START and an END token. Anything that is not a tag, including a stray
+    '<', is text.
+
+    """
+    position = 0
+    for match in _TAG_RE.finditer(tooltip):
+        if match.start() > position:
+            yield TEXT, _unescape(tooltip[position:match.start()])
+        position = match.end()
+
+        is_end, name, is_self_closing = match.groups()
+        name = name.lower()
+        if is_end:
+            if name not in _VOID_TAGS:
+                yield END, name
+        else:
+            yield START, name
+            if is_self_closing and name not in _VOID_TAGS:
+                yield END, name
+    if position < len(tooltip):
+        yield TEXT, _unescape(tooltip[position:])
+
+
+def get_tag_text(tooltip, tag):
+    """
+    Get the text of the first tag element in tooltip html, or None.
+
+    Nested tags are stripped and <br> becomes a newline. An element that
+    is never closed extends to the end of the tooltip.
+
+    """
+    metrics.count('tooltip_parses')
+    text = None
+    depth = 0
+    for token_type, value in tokenize(tooltip):
+        if token_type == TEXT:
+            if depth:
+                text.append(value)
+        elif value == tag:
+            if token_type == START:
+                if text is None:
+                    text = []
+                depth += 1
+            elif depth:
+                depth -= 1
+                if not depth:
+                    break
+        elif value == 'br' and depth:
+            text.append('\n')
+    if text is None:
+        return None
+    return ''.join(text)
+
+
+_PLACEHOLDER_RE = re.compile(r'@\w+@')
+
+
+class TooltipTemplate(object):
+    """
+    Tooltip text compiled into literal segments and @Key@ placeholders.
+
+    Instance variables:
+    text: string tooltip the template was compiled from
+    segments: List of literal strings, one more than there are keys
+    keys: List of placeholder keys, in order of appearance
+    placeholders: frozenset of placeholder keys
+
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = []
+        self.keys = []
+        position = 0
+        for match in _PLACEHOLDER_RE.finditer(text or ''):
+            self.segments.append(text[position:match.start()])
+            self.keys.append(match.group())
+            position = match.end()
+        self.segments.append((text or '')[position:])
+        self.placeholders = frozenset(self.keys)
+
+    def render(self, values):
+        """
+        Substitute values into the placeholders.
+
+        Placeholders without a value are left as-is.
+
+        """
+        parts = [self.segments[0]]
+        for key, segment in zip(self.keys, self.segments[1:]):
+            if key in values:
+                parts.append(str(values[key]))
+            else:
+                parts.append(key)
+            parts.append(segment)
+        return ''.join(parts)
+
+    def render_all(self, values_list):
+        """Render once for every values mapping in values_list."""
+        return [self.render(values) for values in values_list]
+
+    def get_missing_keys(self, values):
+        """Get the set of placeholders without a value."""
+        return set(key for key in self.placeholders if key not in values)
+
+    def __repr__(self):
+        return '<TooltipTemplate %r>' % self.text
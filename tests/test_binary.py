@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import loldb.binary
+import loldb.champion
+import loldb.convert
+import loldb.item
+import loldb.skin
+
+
+def _make_records():
+    champion = loldb.champion.Champion('Ahri')
+    champion.id = 103
+    champion.name = u'Ahri ☆'
+    champion.tags = set(['mage', 'assassin'])
+    champion.tips_as = ['Tip one.']
+    champion.ratings.attack = 3
+    champion.stats.hp = loldb.champion.ChampionStat(380.0, 80.0)
+    champion.stats.attack_speed = loldb.champion.ChampionStat(None, 0.02)
+    champion.stats.range = 550.0
+    skin = loldb.skin.Skin('Ahri')
+    skin.id = 103001
+    skin.name = 'Dynasty Ahri'
+    skin.champion_id = 103
+    champion.skins = [skin]
+
+    other = loldb.champion.Champion('Annie')
+    other.id = 1
+
+    item = loldb.item.Item()
+    item.id = 3128
+    item.name = 'Deathfire Grasp'
+    item.cost = 680
+    item.tier = None
+    item.stats.ap = loldb.item.ItemStat(120.0, 0.0)
+    item.recipe = set([1058, 3108])
+
+    champions = [loldb.convert.format_champion(champion),
+                 loldb.convert.format_champion(other)]
+    items = {item.id: loldb.convert.format_item(item)}
+    return champions, items
+
+
+def _round_trip(record):
+    return json.loads(json.dumps(record, cls=loldb.convert.Encoder))
+
+
+def test_binary_export(tmpdir):
+    champions, items = _make_records()
+    path = str(tmpdir.join('export.bin'))
+    with open(path, 'wb') as f:
+        loldb.binary.write_binary(f, champions, items)
+
+    with loldb.binary.BinaryExport(path) as export:
+        assert export.get_champion_ids() == [1, 103]
+        assert export.get_item_ids() == [3128]
+        assert export.get_skin_ids() == [103001]
+        assert export.get_champion(2) is None
+        assert export.get_item(1) is None
+
+        ahri = export.get_champion(103)
+        assert ahri == _round_trip(champions[0])
+        assert ahri['stats']['attack_speed']['base'] is None
+        assert export.get_skin(103001)['name'] == 'Dynasty Ahri'
+        assert export.get_item(3128) == _round_trip(items[3128])
+        assert [champion['id'] for champion in export.iter_champions()] == \
+            [1, 103]
+
+
+def test_binary_export_invalid(tmpdir):
+    path = tmpdir.join('export.json')
+    path.write('{"champions": [], "items": {}}' + ' ' * 64)
+    with pytest.raises(ValueError):
+        loldb.binary.BinaryExport(str(path))
+
+
+def test_binary_export_truncated(tmpdir):
+    champions, items = _make_records()
+    path = tmpdir.join('export.bin')
+    with path.open('wb') as f:
+        loldb.binary.write_binary(f, champions, items)
+    data = path.read('rb')
+
+    # Cut inside the header, the string index and the item table
+    for size in (0, 10, loldb.binary._HEADER.size + 4, len(data) // 2):
+        path.write(data[:size], 'wb')
+        with pytest.raises(ValueError) as e:
+            loldb.binary.BinaryExport(str(path))
+        assert 'Truncated' in str(e.value)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import loldb.cache
+
+
+@pytest.fixture
+def cache_path(request):
+    path = tempfile.mkdtemp()
+    request.addfinalizer(lambda: shutil.rmtree(path))
+    return os.path.join(path, 'cache')
+
+
+def test_disk_cache_get_set(cache_path):
+    cache = loldb.cache.DiskCache(cache_path)
+    key = ('ability', 'en_US', ('Archive_1.raf', 10, 20, '0.0.0.1'))
+    assert cache.get(key) is None
+    cache.set(key, {'name': 'Orb of Deception'})
+    assert cache.get(key) == {'name': 'Orb of Deception'}
+    assert cache.get(key[:2]) is None
+
+    # Values persist between instances
+    cache = loldb.cache.DiskCache(cache_path)
+    assert cache.get(key) == {'name': 'Orb of Deception'}
+    assert cache.size > 0
+
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache.size == 0
+
+
+def test_disk_cache_eviction(cache_path):
+    cache = loldb.cache.DiskCache(cache_path)
+    cache.set('a', 'x' * 100)
+    cache.set('b', 'x' * 100)
+    entry_size = cache.size // 2
+
+    # Make 'a' the most recently used entry
+    os.utime(os.path.join(cache_path, cache._get_name('a')), (20, 20))
+    os.utime(os.path.join(cache_path, cache._get_name('b')), (10, 10))
+
+    cache = loldb.cache.DiskCache(cache_path, max_size=entry_size * 2)
+    cache.set('c', 'x' * 100)
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.size <= cache.max_size
@@ -0,0 +1,152 @@
+import sys
+from collections import namedtuple
+
+import mock
+
+import loldb.champion
+import loldb.convert
+import loldb.fixture
+import loldb.provider
+
+
+ChampionRow = namedtuple('Row', loldb.champion._CHAMPION_COLUMNS)
+MOCK_CHAMPIONS = [
+    ChampionRow(1, 'Annie', 'Annie', 'the Dark Child', 'Annie_Square_0.png',
+                'mage', 'Lore.', 'Quote.', 'Annie', 2, 3, 10, 6,
+                '*Tip one.*Tip two.', '*Tip three.'),
+    ChampionRow(103, 'Ahri', 'Ahri', 'the Nine-Tailed Fox',
+                'Ahri_Square_0.png', 'mage,assassin', 'Lore.', 'Quote.',
+                'Ahri', 3, 4, 8, 8, '*Tip one.', '*Tip two.'),
+]
+
+
+def _make_stat(base, per_level):
+    return {'base': base, 'per_level': per_level}
+
+
+MOCK_INIBIN = {
+    'stats': {
+        'hp': _make_stat(380, 80),
+        'hp5': _make_stat(5.5, 0.6),
+        'mana': _make_stat(230, 50),
+        'mp5': _make_stat(6.25, 0.6),
+        'dmg': _make_stat(50, 3),
+        'aspd': _make_stat(0.668, 0.02),
+        'armor': _make_stat(11, 3.5),
+        'mr': _make_stat(30, 0),
+        'range': 550,
+        'speed': 330,
+    },
+    'passive': 'Essence Theft',
+    'passive_desc': 'Gains a charge of Essence Theft.',
+    'passive_icon': 'Ahri_SoulEater.dds',
+    'abilities': {
+        'skill1': 'AhriOrbofDeception',
+        'skill2': 'AhriFoxFire',
+        'skill3': 'AhriSeduce',
+        'skill4': 'AhriTumble',
+    },
+}
+
+
+def _find_inibin(provider, paths, kind):
+    if kind == 'champion':
+        return MOCK_INIBIN
+    return None
+
+
+@mock.patch('loldb.champion._find_inibin', side_effect=_find_inibin)
+@mock.patch('loldb.champion.get_skins_for_champion')
+def test_lazy_champions(get_skins_for_champion, find_inibin):
+    provider = mock.MagicMock()
+    provider.get_db_select.return_value = iter(MOCK_CHAMPIONS)
+    get_skins_for_champion.return_value = iter([3, 1, 2])
+
+    champions = loldb.champion.LazyChampions(provider)
+    assert len(champions) == 2
+    ahri = champions.get(103)
+    assert ahri is champions.get_by_name('ahri')
+    assert ahri is champions.get_by_alias('ahri')
+    assert champions.get(2) is None
+    assert ahri.title == 'the Nine-Tailed Fox'
+    assert ahri.tags == set(['mage', 'assassin'])
+    assert not find_inibin.called
+
+    # Stats and abilities share the champion inibin
+    assert ahri.stats.hp == (380, 80)
+    assert ahri.stats.range == 550
+    assert find_inibin.call_count == 1
+    assert [ability.name for ability in ahri.abilities] == ['Essence Theft']
+    assert ahri.abilities is ahri.abilities
+    assert find_inibin.call_count == 5
+
+    assert not get_skins_for_champion.called
+    assert ahri.skins == [1, 2, 3]
+    assert ahri.skins is ahri.skins
+    get_skins_for_champion.assert_called_once_with(provider, 103)
+
+
+class MemoryResourceProvider(loldb.provider.ResourceProvider):
+    def _get_default_path(self):
+        return ''
+
+    def _get_db_path(self):
+        return ':memory:'
+
+
+def test_get_champion_rows_filters():
+    provider = MemoryResourceProvider()
+    db = provider.get_db()
+    db.execute('CREATE TABLE champions (%s)' %
+               ', '.join(ChampionRow._fields))
+    db.executemany(
+        'INSERT INTO champions VALUES (%s)' %
+        ', '.join('?' * len(ChampionRow._fields)),
+        MOCK_CHAMPIONS + [MOCK_CHAMPIONS[0]._replace(
+            id=36,
+            name='DrMundo',
+            displayName='Dr. Mundo',
+            tags='fighter,tank',
+        )],
+    )
+
+    def get_ids(filters):
+        rows = loldb.champion.get_champion_rows(provider, filters)
+        return sorted(row.id for row in rows)
+
+    assert get_ids(None) == [1, 36, 103]
+    assert get_ids(['103']) == [103]
+    assert get_ids(['annie']) == [1]
+    assert get_ids(['Dr. Mundo']) == [36]
+    assert get_ids(['dr_mundo', 'assassin']) == [36, 103]
+    assert get_ids(['MAGE']) == [1, 103]
+    assert get_ids(['tan']) == []
+    # LIKE wildcards in a term are matched literally
+    assert get_ids(['ta_k', 'm%', '%']) == []
+
+
+def test_champion_slots():
+    lazy_champion = loldb.champion.LazyChampion('Ahri', mock.MagicMock())
+    assert not hasattr(lazy_champion, '__dict__')
+    champion = loldb.champion.Champion('Ahri')
+    assert not hasattr(champion, '__dict__')
+    assert champion.id == -1
+    assert champion.stats.hp == (0, 0)
+    assert champion.ratings.attack == 0
+
+
+def test_get_champions_parallel(tmpdir, monkeypatch):
+    path = str(tmpdir.join('install'))
+    loldb.fixture.write_fixture(path, champions=4, items=0, skins=2)
+    # RAFArchive prints every archive it opens
+    monkeypatch.setattr(sys, 'stdout', tmpdir.join('stdout').open('w'))
+    provider = loldb.provider.LinuxResourceProvider(path)
+
+    def get_records(jobs):
+        champions = loldb.champion.get_champions(provider, jobs=jobs)
+        return [loldb.convert.format_champion(c) for c in champions]
+
+    records = get_records(1)
+    assert [record['id'] for record in records] == [1, 2, 3, 4]
+    # Champions are pickled back from the workers
+    assert get_records(2) == records
@@ -0,0 +1,80 @@
+import json
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import loldb.convert
+
+
+MOCK_CHAMPIONS = [
+    {'id': 1, 'name': 'Annie', 'tags': set(['mage'])},
+    {'id': 103, 'name': 'Ahri', 'lore': {'body': 'Line one.\n\nLine two.'}},
+]
+MOCK_ITEMS = {
+    1001: {'id': 1001, 'name': 'Boots of Speed', 'recipe': set()},
+    3006: {'id': 3006, 'name': 'Berserker\'s Greaves', 'recipe': set([1001])},
+}
+
+
+def test_write_json():
+    f = StringIO()
+    loldb.convert.write_json(f, iter(MOCK_CHAMPIONS), MOCK_ITEMS)
+    output = json.loads(f.getvalue())
+    assert output == json.loads(
+        loldb.convert.to_json(MOCK_CHAMPIONS, MOCK_ITEMS)
+    )
+
+    f = StringIO()
+    loldb.convert.write_json(f, [], [])
+    assert json.loads(f.getvalue()) == {'champions': [], 'items': {}}
+
+
+def test_write_ndjson():
+    f = StringIO()
+    loldb.convert.write_ndjson(f, iter(MOCK_CHAMPIONS), MOCK_ITEMS)
+    lines = f.getvalue().splitlines()
+    assert len(lines) == 4
+
+    records = [json.loads(line) for line in lines]
+    assert [r['type'] for r in records] == ['champion'] * 2 + ['item'] * 2
+    assert records[0]['data'] == {'id': 1, 'name': 'Annie', 'tags': ['mage']}
+    assert records[1]['data']['lore']['body'] == 'Line one.\n\nLine two.'
+    assert set(r['data']['id'] for r in records[2:]) == set(MOCK_ITEMS)
+
+
+def test_write_yaml():
+    import yaml
+
+    f = StringIO()
+    loldb.convert.write_yaml(f, iter(MOCK_CHAMPIONS), MOCK_ITEMS)
+    output = f.getvalue()
+    assert '!!set' not in output
+
+    output = yaml.safe_load(output)
+    assert output['champions'][0] == {'id': 1, 'name': 'Annie', 'tags': ['mage']}
+    assert output['champions'][1] == MOCK_CHAMPIONS[1]
+    assert sorted(output['items']) == [1001, 3006]
+    assert output['items'][3006]['recipe'] == [1001]
+
+
+def test_merge_records():
+    champions, items = loldb.convert.merge_records(
+        MOCK_CHAMPIONS,
+        MOCK_ITEMS,
+        [{'id': 103, 'name': 'Ahri 2'}, {'id': 22, 'name': 'Ashe'}],
+        {3006: {'id': 3006, 'name': 'Greaves'}},
+    )
+    assert [champion['id'] for champion in champions] == [1, 103, 22]
+    assert champions[1]['name'] == 'Ahri 2'
+    assert items[3006]['name'] == 'Greaves'
+    assert items[1001] is MOCK_ITEMS[1001]
+
+    f = StringIO()
+    loldb.convert.write_json(f, champions, items)
+    f.seek(0)
+    read_champions, read_items = loldb.convert.read_json(f)
+    assert [champion['id'] for champion in read_champions] == [1, 103, 22]
+    assert sorted(read_items) == [1001, 3006]
+    assert read_items[3006] == {'id': 3006, 'name': 'Greaves'}
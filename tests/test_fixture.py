@@ -0,0 +1,84 @@
+import sys
+import warnings
+
+import pytest
+from inibin import Inibin
+
+import loldb.champion
+import loldb.fixture
+import loldb.item
+import loldb.provider
+
+
+def test_make_inibin():
+    inibin = Inibin(data=loldb.fixture.make_inibin({
+        1: 2.5,
+        -3: u'text',
+    }))
+    assert dict(inibin) == {1: 2.5, -3: 'text'}
+
+
+@pytest.fixture
+def provider(tmpdir, monkeypatch):
+    path = str(tmpdir.join('install'))
+    loldb.fixture.write_fixture(path, champions=3, items=30, skins=2)
+    # RAFArchive prints every archive it opens
+    monkeypatch.setattr(sys, 'stdout', tmpdir.join('stdout').open('w'))
+    return loldb.provider.LinuxResourceProvider(path)
+
+
+def test_write_fixture(provider):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        champions = list(loldb.champion.get_champions(provider))
+        items = loldb.item.get_items(provider)
+    assert not caught
+
+    assert [c.internal_name for c in champions] == [
+        'Champion1', 'Champion2', 'Champion3',
+    ]
+    champion = champions[1]
+    assert champion.name == 'Champion 2'
+    assert 325 <= champion.stats.speed <= 355
+    assert [skin.id for skin in champion.skins] == [2000, 2001]
+    # Passive and four abilities, names are read from the fontconfig
+    assert [a.name for a in champion.abilities] == [
+        'Champion2 Passive', 'Champion2Q Spell', 'Champion2W Spell',
+        'Champion2E Spell', 'Champion2R Spell',
+    ]
+    assert len(champion.abilities[4].levels) == 3
+    assert not any(champion.abilities[1].get_missing_tooltip_keys())
+
+    assert sorted(items) == list(range(1001, 1031))
+    for item in items.values():
+        assert item.categories
+        assert all(component < item.id for component in item.recipe)
+
+
+def test_write_fixture_language(tmpdir, monkeypatch):
+    path = str(tmpdir.join('install'))
+    loldb.fixture.write_fixture(path, champions=1, items=25, skins=1,
+                                language='fr_FR')
+    monkeypatch.setattr(sys, 'stdout', tmpdir.join('stdout').open('w'))
+    provider = loldb.provider.LinuxResourceProvider(path, language='fr_FR')
+    champion, = loldb.champion.get_champions(provider)
+    assert champion.abilities[1].name == 'Champion1Q Spell'
+    assert len(loldb.item.get_items(provider)) == 25
+
+
+def test_write_fixture_is_seeded(tmpdir):
+    for name in ('a', 'b'):
+        loldb.fixture.write_fixture(str(tmpdir.join(name)), champions=1,
+                                    items=25)
+    archive = 'RADS/projects/lol_game_client/filearchives/0.0.0.1/' \
+        'Archive_1.raf.dat'
+    assert tmpdir.join('a', archive).read('rb') == \
+        tmpdir.join('b', archive).read('rb')
+
+
+def test_get_provider_class():
+    get_provider_class = loldb.provider.get_provider_class
+    assert get_provider_class('win') is loldb.provider.WindowsResourceProvider
+    assert get_provider_class('linux') is loldb.provider.LinuxResourceProvider
+    with pytest.raises(RuntimeError):
+        get_provider_class('amiga')
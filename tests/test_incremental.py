@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+import mock
+
+import loldb.incremental
+
+
+ChampionRow = namedtuple('Row', 'id name')
+SkinRow = namedtuple('Row', 'id championId')
+ItemRow = namedtuple('Row', 'id price')
+CategoryRow = namedtuple('Row', 'id name')
+ItemCategoryRow = namedtuple('Row', 'itemId itemCategoryId')
+RecipeRow = namedtuple('Row', 'buildsToItemId recipeItemId')
+
+
+def _make_provider(tables):
+    provider = mock.MagicMock()
+    provider.language = 'en_US'
+    provider.get_db_rows = lambda table: iter(tables[table])
+    provider.get_db_select = lambda table, columns, **kwargs: iter(
+        tables[table]
+    )
+    provider.get_raf_index().fingerprint = lambda path: (path, 0, 0, '0')
+    provider.get_font_config_fingerprint.return_value = None
+    return provider
+
+
+def _make_tables(price=100, skins=1):
+    return {
+        'champions': [ChampionRow(1, 'Annie'), ChampionRow(103, 'Ahri')],
+        'championSkins': [SkinRow(103000 + i, 103) for i in range(skins)],
+        'items': [ItemRow(1001, 300), ItemRow(3006, price)],
+        'itemCategories': [CategoryRow(1, 'boots')],
+        'itemItemCategories': [ItemCategoryRow(1001, 1)],
+        'itemRecipes': [RecipeRow(3006, 1001)],
+    }
+
+
+def _make_champion(id):
+    champion = mock.MagicMock()
+    champion.id = id
+    champion._inibin = None
+    return champion
+
+
+def _run_build(tables, previous=None, skip_corrections=False):
+    provider = _make_provider(tables)
+    build = loldb.incremental.IncrementalBuild(provider, '0.1.0', previous,
+                                               skip_corrections)
+    path = 'loldb.incremental.get_champions_from_rows'
+    with mock.patch(path) as get_champions_from_rows:
+        get_champions_from_rows.side_effect = lambda _, rows, jobs: [
+            _make_champion(row.id) for row in rows
+        ]
+        for champion in build.get_champions():
+            build.add_champion(champion, {'id': champion.id})
+    build.add_items(dict((row.id, {'id': row.id, 'cost': row.price})
+                         for row in tables['items']))
+    return build
+
+
+def test_incremental_build_initial():
+    build = _run_build(_make_tables())
+    assert build.changed_champion_ids == set([1, 103])
+    assert build.changed_item_ids == set([1001, 3006])
+    assert build.manifest.get_champion_records() == [{'id': 1}, {'id': 103}]
+
+
+def test_incremental_build_changes():
+    previous = _run_build(_make_tables()).manifest
+
+    build = _run_build(_make_tables(), previous)
+    assert build.changed_champion_ids == set()
+    assert build.changed_item_ids == set()
+
+    tables = _make_tables(price=500, skins=2)
+    tables['items'] = tables['items'][1:]
+    build = _run_build(tables, previous)
+    assert build.changed_champion_ids == set([103])
+    assert build.changed_item_ids == set([3006])
+    assert build.manifest.get_champion_records() == [{'id': 1}, {'id': 103}]
+
+    delta = build.get_delta()
+    assert delta['champions'] == [{'id': 103}]
+    assert delta['items'] == {3006: {'id': 3006, 'cost': 500}}
+    assert delta['removed_champions'] == []
+    assert delta['removed_items'] == [1001]
+
+
+def test_incremental_build_incompatible_manifest():
+    previous = _run_build(_make_tables()).manifest
+    previous.version = '0.0.1'
+    build = _run_build(_make_tables(), previous)
+    assert build.changed_champion_ids == set([1, 103])
+
+
+def test_incremental_build_changed_corrections():
+    previous = _run_build(_make_tables()).manifest
+    build = _run_build(_make_tables(), previous, skip_corrections=True)
+    assert build.changed_champion_ids == set([1, 103])
+    assert build.manifest.corrections is None
+
+    previous = build.manifest
+    build = _run_build(_make_tables(), previous, skip_corrections=True)
+    assert build.changed_champion_ids == set()
+
+    previous = _run_build(_make_tables()).manifest
+    previous.corrections = 'edited'
+    build = _run_build(_make_tables(), previous)
+    assert build.changed_champion_ids == set([1, 103])
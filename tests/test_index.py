@@ -0,0 +1,76 @@
+import loldb.champion
+import loldb.index
+import loldb.item
+import loldb.skin
+import loldb.util
+
+
+def _make_champion(id, internal_name, name, tags, skin_ids):
+    champion = loldb.champion.Champion(internal_name)
+    champion.id = id
+    champion.name = name
+    champion.alias = loldb.util.alias(name)
+    champion.tags = set(tags)
+    for skin_id in skin_ids:
+        skin = loldb.skin.Skin(internal_name)
+        skin.id = skin_id
+        champion.skins.append(skin)
+    return champion
+
+
+def _make_item(id, name, categories):
+    item = loldb.item.Item()
+    item.id = id
+    item.name = name
+    item.alias = loldb.util.alias(name)
+    item.categories = set(categories)
+    return item
+
+
+def _make_index():
+    champions = [
+        _make_champion(103, 'Ahri', 'Ahri', ['mage', 'assassin'], [103000]),
+        _make_champion(1, 'Annie', 'Annie', ['mage'], [1000, 1001]),
+        _make_champion(36, 'DrMundo', 'Dr. Mundo', ['fighter'], [36000]),
+    ]
+    items = [
+        _make_item(3128, 'Deathfire Grasp', ['spell_damage', 'active']),
+        _make_item(1058, 'Needlessly Large Rod', ['spell_damage']),
+        _make_item(1001, 'Boots of Speed', ['boots']),
+    ]
+    return loldb.index.ExportIndex.from_models(
+        champions,
+        dict((item.id, item) for item in items)
+    )
+
+
+def _get_ids(records):
+    return [record['id'] for record in records]
+
+
+def test_export_index_champions():
+    index = _make_index()
+    assert index.get_champion(1)['name'] == 'Annie'
+    assert index.get_champion(2) is None
+    assert _get_ids(index.find_champions('103')) == [103]
+    assert _get_ids(index.find_champions('drmundo')) == [36]
+    assert _get_ids(index.find_champions('Dr. Mundo')) == [36]
+    assert _get_ids(index.find_champions('dr_mundo')) == [36]
+    assert _get_ids(index.find_champions('MAGE')) == [1, 103]
+    assert _get_ids(index.find_champions('2')) == []
+    assert _get_ids(index.get_champions_by_tag('assassin')) == [103]
+    assert _get_ids(index.find_champions_by_prefix('a')) == [1, 103]
+    assert _get_ids(index.find_champions_by_prefix('anniez')) == []
+    assert index.get_champion_by_skin(1001)['id'] == 1
+    assert index.get_champion_by_skin(2) is None
+
+
+def test_export_index_items():
+    index = _make_index()
+    assert index.get_item(1001)['name'] == 'Boots of Speed'
+    assert _get_ids(index.find_items('deathfire grasp')) == [3128]
+    assert _get_ids(index.find_items('needlessly_large_rod')) == [1058]
+    assert _get_ids(index.find_items('spell_damage')) == [1058, 3128]
+    assert _get_ids(index.get_items_by_category('BOOTS')) == [1001]
+    assert _get_ids(index.find_items_by_prefix('Dea')) == [3128]
+    assert _get_ids(index.find_items_by_prefix('z')) == []
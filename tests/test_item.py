@@ -118,16 +118,19 @@ def verify_item_stats(item, row):
         assert item_stat.percentage == percentage
 
 
-def _get_db_rows_items(table):
+def _get_db_select_items(table, columns, where=None, parameters=()):
     assert table == 'items'
+    assert where is None
     for item in MOCK_ITEMS:
-        yield _make_stat_row(item)
+        row = _make_stat_row(item)
+        yield _make_row(dict((column, getattr(row, column))
+                             for column in columns))
 
 
 @mock.patch('loldb.item.ItemStats')
 def test_get_item_map(ItemStats):
     provider = mock.MagicMock()
-    provider.get_db_rows = _get_db_rows_items
+    provider.get_db_select = _get_db_select_items
 
     items = loldb.item._get_item_map(provider)
 
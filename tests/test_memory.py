@@ -0,0 +1,107 @@
+import mock
+import pytest
+
+import loldb.champion
+import loldb.item
+import loldb.memory
+import loldb.metrics
+
+
+@pytest.fixture
+def memory(request):
+    request.addfinalizer(loldb.metrics.disable)
+    memory = loldb.memory.MemoryRecorder(top_sites=3)
+    loldb.metrics.enable(memory=memory)
+    return memory
+
+
+def _make_tracemalloc():
+    """Get a mock tracemalloc that traced 100 bytes, peaking at 300."""
+    tracemalloc = mock.MagicMock()
+    tracemalloc.__file__ = 'tracemalloc.py'
+    tracemalloc.is_tracing.return_value = False
+    tracemalloc.get_traced_memory.side_effect = [(100, 100), (200, 300)]
+    sites = []
+    for i in range(5):
+        site = mock.MagicMock()
+        site.traceback = ['loldb/champion.py:%d' % i]
+        site.size_diff = 1000 - i
+        site.count_diff = 10
+        sites.append(site)
+    snapshot = tracemalloc.take_snapshot().filter_traces.return_value
+    snapshot.compare_to.return_value = sites
+    return tracemalloc
+
+
+def test_stage_memory_traced(request, monkeypatch):
+    tracemalloc = _make_tracemalloc()
+    monkeypatch.setattr(loldb.memory, 'tracemalloc', tracemalloc)
+    request.addfinalizer(loldb.metrics.disable)
+    memory = loldb.memory.MemoryRecorder(top_sites=3)
+    assert memory.tracing
+    tracemalloc.start.assert_called_once_with()
+    loldb.metrics.enable(memory=memory)
+
+    with loldb.metrics.stage('extract'):
+        champion = loldb.champion.Champion('Ahri')
+    stage = memory.stages['extract']
+    assert stage.traced_growth == 100
+    assert stage.traced_peak == 300
+    assert stage.top_sites == [
+        ('loldb/champion.py:0', 1000, 10),
+        ('loldb/champion.py:1', 999, 10),
+        ('loldb/champion.py:2', 998, 10),
+    ]
+    assert stage.rss_growth is None
+    assert stage.objects['Champion'] >= 1
+    assert champion
+
+
+def test_stage_memory(memory):
+    for _ in range(2):
+        with loldb.metrics.stage('extract'):
+            values = [str(i) for i in range(1000)]
+            champion = loldb.champion.Champion('Ahri')
+    assert values and champion
+    stage = memory.stages['extract']
+    if memory.tracing:
+        assert stage.traced_growth is not None
+        assert len(stage.top_sites) <= 3
+    else:
+        assert stage.rss_growth >= 0
+        assert stage.top_sites == []
+    assert stage.objects['Champion'] >= 1
+
+
+def test_stage_memory_without_resource(monkeypatch):
+    monkeypatch.setattr(loldb.memory, 'resource', None)
+    monkeypatch.setattr(loldb.memory, 'tracemalloc', None)
+    memory = loldb.memory.MemoryRecorder()
+    memory.stop('extract', memory.start('extract'))
+    assert memory.stages['extract'].rss_growth is None
+    assert memory.to_dict()['max_rss'] is None
+
+
+def test_count_objects(memory):
+    champions = [loldb.champion.Champion('Ahri'),
+                 loldb.champion.Champion('Annie')]
+    item = loldb.item.Item()
+    memory.count_objects('extracted')
+    counts = memory.objects['extracted']
+    assert counts['Champion'] >= 2
+    assert counts['ChampionStats'] >= 2
+    assert counts['Item'] >= 1
+    assert champions and item
+
+
+def test_to_dict(memory):
+    with loldb.metrics.stage('format'):
+        pass
+    memory.count_objects('end')
+    report = memory.to_dict()
+    assert list(report['stages']) == ['format']
+    assert set(report['stages']['format']) == set([
+        'traced_growth', 'traced_peak', 'top_sites', 'rss_growth', 'objects',
+    ])
+    assert 'end' in report['objects']
+    assert report['max_rss'] > 0
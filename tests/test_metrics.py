@@ -0,0 +1,67 @@
+import pytest
+
+import loldb.metrics
+
+
+@pytest.fixture
+def recorder(request):
+    request.addfinalizer(loldb.metrics.disable)
+    return loldb.metrics.enable()
+
+
+def test_disabled():
+    rows = [1, 2]
+    assert loldb.metrics.iter_stage('extract', rows) is rows
+    assert loldb.metrics.count_rows('sql_rows', rows) is rows
+    with loldb.metrics.stage('extract'):
+        loldb.metrics.count('sql_queries')
+
+
+def test_stage(recorder):
+    for _ in range(2):
+        with loldb.metrics.stage('correct'):
+            pass
+    times = recorder.stages['correct']
+    assert times.calls == 2
+    assert times.wall >= 0 and times.cpu >= 0
+
+    with pytest.raises(ValueError):
+        with loldb.metrics.stage('format'):
+            raise ValueError()
+    assert recorder.stages['format'].calls == 1
+
+
+def test_iter_stage(recorder):
+    values = loldb.metrics.iter_stage('extract', iter('abc'))
+    assert list(values) == ['a', 'b', 'c']
+    assert recorder.stages['extract'].calls == 3
+
+
+def test_count(recorder):
+    loldb.metrics.count('sql_queries')
+    loldb.metrics.count('raf_bytes_read', 10)
+    rows = loldb.metrics.count_rows('sql_rows', [(1,), (2,)])
+    assert list(rows) == [(1,), (2,)]
+    assert recorder.counters == {
+        'sql_queries': 1,
+        'raf_bytes_read': 10,
+        'sql_rows': 2,
+    }
+
+
+def test_count_file_size(recorder, tmpdir):
+    path = tmpdir.join('output.json')
+    path.write('{}')
+    loldb.metrics.count_file_size('bytes_written_json', str(path))
+    assert recorder.counters['bytes_written_json'] == 2
+
+
+def test_to_dict(recorder):
+    with loldb.metrics.stage('extract'):
+        loldb.metrics.count('inibins_parsed')
+    results = recorder.to_dict()
+    assert list(results['stages']) == ['extract']
+    assert results['stages']['extract']['calls'] == 1
+    assert results['counters'] == {'inibins_parsed': 1}
+    table = recorder.format_table()
+    assert 'extract' in table and 'inibins_parsed' in table
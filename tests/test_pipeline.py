@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import benchmarks.pipeline
+
+
+def get_regressions(results, baseline, threshold=0.25):
+    return list(benchmarks.pipeline.get_regressions(results, baseline,
+                                                    threshold))
+
+
+def test_get_regressions():
+    baseline = {
+        'rows': {'seconds': 0.1, 'memory': 10 * 1024 * 1024},
+        'to_json': {'seconds': 0.2, 'memory': 20 * 1024 * 1024},
+    }
+    assert get_regressions({
+        'rows': {'seconds': 0.12, 'memory': 12 * 1024 * 1024},
+        'to_json': {'seconds': 0.1, 'memory': 10 * 1024 * 1024},
+    }, baseline) == []
+    assert get_regressions({
+        'rows': {'seconds': 0.2, 'memory': 10 * 1024 * 1024},
+        'to_json': {'seconds': 0.2, 'memory': 30 * 1024 * 1024},
+    }, baseline) == [
+        'rows seconds regressed from 0.1 to 0.2',
+        'to_json memory regressed from 20971520 to 31457280',
+    ]
+    assert get_regressions({
+        'rows': {'seconds': 0.2, 'memory': 10 * 1024 * 1024},
+    }, baseline, threshold=1.5) == []
+
+
+def test_get_regressions_ignores_noise():
+    baseline = {'rows': {'seconds': 0.0001, 'memory': 1024}}
+    assert get_regressions({
+        'rows': {'seconds': 0.0005, 'memory': 32 * 1024},
+    }, baseline) == []
+    assert get_regressions({
+        'rows': {'seconds': 0.01, 'memory': 1024 * 1024},
+    }, baseline) == [
+        'rows seconds regressed from 0.0001 to 0.01',
+        'rows memory regressed from 1024 to 1048576',
+    ]
+
+
+def test_get_regressions_skips_unknown():
+    baseline = {'rows': {'seconds': 0.1, 'memory': None}}
+    results = {
+        'rows': {'seconds': 0.1, 'memory': 1024 * 1024},
+        'to_yaml': {'seconds': 10.0, 'memory': None},
+    }
+    assert get_regressions(results, baseline) == []
+    assert get_regressions({'rows': {'seconds': 0.1, 'memory': None}},
+                           {'rows': {'seconds': 0.1, 'memory': 1}}) == []
+
+
+def _exit(queue):
+    os._exit(3)
+
+
+def _sleep(queue):
+    time.sleep(60)
+
+
+def _start(target):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(queue,))
+    process.start()
+    return queue, process
+
+
+def test_get_result_dead_process():
+    queue, process = _start(_exit)
+    with pytest.raises(RuntimeError) as e:
+        benchmarks.pipeline._get_result(queue, process, 60)
+    process.join()
+    assert 'code 3' in str(e.value)
+
+
+def test_get_result_timeout():
+    queue, process = _start(_sleep)
+    with pytest.raises(RuntimeError):
+        benchmarks.pipeline._get_result(queue, process, 0)
+    process.join()
+    assert process.exitcode is not None
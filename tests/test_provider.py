@@ -0,0 +1,208 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+import mock
+import pytest
+
+import loldb.metrics
+import loldb.provider
+
+
+# Archives are sorted by version, entries are keyed by path
+MOCK_ARCHIVES = [
+    ('0.0.0.1/Archive_1.raf', {
+        'DATA/Characters/Ahri/Ahri.inibin': 'old',
+        'DATA/Characters/Annie/Annie.inibin': 'annie',
+        'DATA/Spells/SummonerFlash.inibin': 'flash',
+    }),
+    ('0.0.0.2/Archive_2.raf', {
+        'DATA/Characters/Ahri/Ahri.inibin': 'ahri',
+        'DATA/Characters/Ahri/Spells/AhriOrbofDeception.inibin': 'orb',
+        'DATA/Menu/fontconfig_en_US.txt': 'fontconfig',
+    }),
+]
+
+
+def _make_raf_index():
+    raf_master = mock.MagicMock()
+    raf_master.archives = []
+    for archive_path, entries in MOCK_ARCHIVES:
+        archive = mock.MagicMock()
+        archive.path = archive_path
+        archive.entries_by_path.return_value = entries
+        raf_master.archives.append(archive)
+    return loldb.provider.RAFIndex(raf_master)
+
+
+def test_raf_index_find():
+    raf_index = _make_raf_index()
+    assert len(raf_index) == 5
+    # Most recent version is used, lookups are case-insensitive
+    assert raf_index.find('data/characters/ahri/ahri.inibin') == 'ahri'
+    assert raf_index.find('DATA/CHARACTERS/ANNIE/ANNIE.INIBIN') == 'annie'
+    assert raf_index.find('data/characters/ahri') is None
+    assert 'data/spells/summonerflash.inibin' in raf_index
+
+
+def test_raf_index_counts_lookups(request):
+    request.addfinalizer(loldb.metrics.disable)
+    recorder = loldb.metrics.enable()
+    raf_index = _make_raf_index()
+    path = 'DATA/Characters/Annie/Annie.inibin'
+    assert path in raf_index
+    assert raf_index.find(path) == 'annie'
+    assert recorder.counters['raf_lookups'] == 1
+
+
+def test_raf_index_find_prefix():
+    raf_index = _make_raf_index()
+    results = list(raf_index.find_prefix('data/characters/ahri/'))
+    assert sorted(results) == ['ahri', 'orb']
+    assert list(raf_index.find_prefix('data/sounds/')) == []
+
+
+def test_raf_index_find_glob():
+    raf_index = _make_raf_index()
+    results = list(raf_index.find_glob('data/characters/*/*.inibin'))
+    assert sorted(results) == ['ahri', 'annie', 'orb']
+    results = list(raf_index.find_glob('*/fontconfig_??_??.txt'))
+    assert results == ['fontconfig']
+
+
+def test_raf_index_fingerprint():
+    raf_index = _make_raf_index()
+    raf_index.entries['data/spells/summonerflash.inibin'] = mock.MagicMock(
+        offset=10,
+        size=20,
+    )
+    fingerprint = raf_index.fingerprint('DATA/Spells/SummonerFlash.inibin')
+    assert fingerprint == ('0.0.0.1/Archive_1.raf', 10, 20, '0.0.0.1')
+    assert raf_index.fingerprint('data/spells/missing.inibin') is None
+
+
+class MemoryResourceProvider(loldb.provider.ResourceProvider):
+    def _get_default_path(self):
+        return ''
+
+    def _get_db_path(self):
+        return ':memory:'
+
+
+def _make_db_provider():
+    provider = MemoryResourceProvider()
+    db = provider.get_db()
+    db.execute('CREATE TABLE items (id INTEGER, name TEXT, price INTEGER)')
+    db.executemany('INSERT INTO items VALUES (?, ?, ?)', [
+        (1001, 'Boots of Speed', 300),
+        (3006, 'Berserker\'s Greaves', 500),
+    ])
+    return provider
+
+
+def test_get_db_select():
+    provider = _make_db_provider()
+
+    rows = list(provider.get_db_select('items', ['id', 'price']))
+    assert [(row.id, row.price) for row in rows] == [(1001, 300), (3006, 500)]
+    assert not hasattr(rows[0], 'name')
+
+    # Row classes are reused
+    rows_again = list(provider.get_db_select('items', ['id', 'price']))
+    assert type(rows_again[0]) is type(rows[0])
+
+    rows = list(provider.get_db_select(
+        'items',
+        ['name'],
+        where='price > ?',
+        parameters=(400,),
+        named=False,
+    ))
+    assert rows == [('Berserker\'s Greaves',)]
+
+
+def test_get_db_query():
+    provider = _make_db_provider()
+    query = 'SELECT * FROM items WHERE id = ?'
+    row, = provider.get_db_query(query, (1001,))
+    assert row.name == 'Boots of Speed'
+    row_again, = provider.get_db_query(query, (3006,))
+    assert type(row_again) is type(row)
+
+
+class FileResourceProvider(loldb.provider.ResourceProvider):
+    def _get_default_path(self):
+        return ''
+
+    def _get_db_path(self):
+        return os.path.join(self.base_path, 'gameStats_en_US.sqlite')
+
+
+def _make_file_db_provider(request, **kwargs):
+    path = tempfile.mkdtemp()
+    request.addfinalizer(lambda: shutil.rmtree(path))
+    db = sqlite3.connect(os.path.join(path, 'gameStats_en_US.sqlite'))
+    db.execute('CREATE TABLE items (id INTEGER, name TEXT)')
+    db.execute('INSERT INTO items VALUES (1001, \'Boots of Speed\')')
+    db.commit()
+    db.close()
+    return FileResourceProvider(lol_path=path, **kwargs)
+
+
+def _get_names_in_thread(provider):
+    names = []
+
+    def get_names():
+        rows = provider.get_db_select('items', ['name'], named=False)
+        names.extend(name for name, in rows)
+        names.append(provider.get_db())
+
+    thread = threading.Thread(target=get_names)
+    thread.start()
+    thread.join()
+    return names
+
+
+def test_read_only_db(request):
+    provider = _make_file_db_provider(request, read_only=True)
+    db = provider.get_db()
+    with pytest.raises(sqlite3.DatabaseError):
+        db.execute('INSERT INTO items VALUES (3006, \'Greaves\')')
+
+    # Each thread has its own connection
+    name, thread_db = _get_names_in_thread(provider)
+    assert name == 'Boots of Speed'
+    assert thread_db is not db
+
+
+def test_read_only_db_is_not_locked(request):
+    provider = _make_file_db_provider(request, read_only=True)
+    writer = sqlite3.connect(provider._get_db_path())
+    writer.execute('BEGIN EXCLUSIVE')
+    try:
+        rows = provider.get_db_select('items', ['name'], named=False)
+        assert list(rows) == [('Boots of Speed',)]
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_read_only_db_missing(request):
+    provider = _make_file_db_provider(request, read_only=True)
+    os.remove(provider._get_db_path())
+    with pytest.raises((IOError, sqlite3.Error)):
+        list(provider.get_db_rows('items'))
+    assert not os.path.exists(provider._get_db_path())
+
+
+def test_snapshot_db(request):
+    provider = _make_file_db_provider(request, snapshot=True)
+    assert provider.read_only
+    provider.get_db()
+
+    # Snapshot is not affected by later changes to the install
+    os.remove(provider._get_db_path())
+    name, _ = _get_names_in_thread(provider)
+    assert name == 'Boots of Speed'
@@ -0,0 +1,98 @@
+import json
+import warnings
+from collections import namedtuple
+
+import mock
+
+import loldb.convert
+import loldb.recipe
+
+
+ItemRow = namedtuple('Row', 'id price')
+RecipeRow = namedtuple('Row', 'buildsToItemId recipeItemId')
+
+# Deathfire Grasp: Needlessly Large Rod and Fiendish Codex (Amplifying Tome)
+ITEM_ROWS = [
+    ItemRow(1052, 435),
+    ItemRow(1058, 1600),
+    ItemRow(3108, 385),
+    ItemRow(3128, 680),
+]
+RECIPE_ROWS = [
+    RecipeRow(3108, 1052),
+    RecipeRow(3128, 1058),
+    RecipeRow(3128, 3108),
+    RecipeRow(3128, 9999),
+]
+
+
+def _get_db_select(table, columns, named=True):
+    return iter({'items': ITEM_ROWS, 'itemRecipes': RECIPE_ROWS}[table])
+
+
+def test_recipe_graph():
+    provider = mock.MagicMock()
+    provider.get_db_select.side_effect = _get_db_select
+    graph = loldb.recipe.get_recipe_graph(provider)
+
+    assert len(graph) == 4
+    assert 9999 not in graph
+    order = graph.order
+    assert order.index(1052) < order.index(3108) < order.index(3128)
+
+    assert graph.get_components(3128) == set([1058, 3108])
+    assert graph.get_all_components(3128) == set([1052, 1058, 3108])
+    assert graph.get_builds_into(1052) == set([3108])
+    assert graph.get_builds_into(3128) == set()
+    assert graph.get_combine_cost(3128) == 680
+    assert graph.get_total_cost(3128) == 3100
+    assert graph.get_total_cost(1052) == 435
+    assert graph.get_build_paths(3128) == ((1058, 3128), (1052, 3108, 3128))
+    assert graph.get_build_paths(1052) == ((1052,),)
+
+
+def test_recipe_graph_cycle():
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        graph = loldb.recipe.RecipeGraph(
+            {1: 10, 2: 20, 3: 30, 4: 40},
+            # 2 and 3 build into each other, 4 builds into itself
+            {2: [1, 3], 3: [2], 4: [4, 1]},
+        )
+    assert len(caught) == 2
+    assert graph.get_components(2) == set([1, 3])
+    assert graph.get_components(3) == set()
+    assert graph.get_components(4) == set([1])
+    assert graph.get_total_cost(2) == 60
+    assert graph.get_total_cost(4) == 50
+    assert sorted(graph.order) == [1, 2, 3, 4]
+
+
+def test_recipe_graph_duplicate_component():
+    provider = mock.MagicMock()
+    provider.get_db_select.side_effect = lambda table, columns, named: iter({
+        'items': [ItemRow(1001, 300), ItemRow(1052, 435), ItemRow(3006, 100)],
+        # Two Boots of Speed and an Amplifying Tome
+        'itemRecipes': [RecipeRow(3006, 1001), RecipeRow(3006, 1052),
+                        RecipeRow(3006, 1001)],
+    }[table])
+    graph = loldb.recipe.get_recipe_graph(provider)
+
+    assert graph.get_components(3006) == set([1001, 1052])
+    assert graph.get_component_count(3006, 1001) == 2
+    assert graph.get_component_count(3006, 1052) == 1
+    assert graph.get_total_cost(3006) == 1135
+    assert graph.get_build_paths(3006) == (
+        (1001, 3006), (1001, 3006), (1052, 3006),
+    )
+
+
+def test_format_item_recipe():
+    graph = loldb.recipe.RecipeGraph({1: 100, 2: 50}, {2: [1]})
+    record = loldb.convert.format_item_recipe(graph, 2)
+    assert json.loads(json.dumps(record, cls=loldb.convert.Encoder)) == {
+        'total_cost': 150,
+        'all_components': [1],
+        'builds_into': [],
+        'build_paths': [[1, 2]],
+    }
@@ -0,0 +1,46 @@
+from collections import namedtuple
+
+import mock
+
+import loldb.skin
+
+
+SkinRow = namedtuple(
+    'Row',
+    'id name displayName portraitPath splashPath isBase championId rank'
+)
+MOCK_SKINS = [
+    SkinRow(103001, 'AhriHanbok', 'Dynasty Ahri', 'Ahri_1.jpg',
+            'Ahri_Splash_1.jpg', 0, 103, 1),
+    SkinRow(1000, 'BaseAnnie', '', 'Annie_0.jpg', 'Annie_Splash_0.jpg',
+            1, 1, 0),
+    SkinRow(103000, 'BaseAhri', '', 'Ahri_0.jpg', 'Ahri_Splash_0.jpg',
+            1, 103, 0),
+]
+
+
+def test_get_skins_by_champion():
+    provider = mock.MagicMock()
+    provider.get_db_select.return_value = iter(MOCK_SKINS)
+
+    skins = loldb.skin.get_skins_by_champion(provider)
+
+    assert provider.get_db_select.call_count == 1
+    assert provider.get_db_select.call_args[0][0] == 'championSkins'
+    assert sorted(skins) == [1, 103]
+    assert [skin.id for skin in skins[1]] == [1000]
+    assert [skin.id for skin in skins[103]] == [103000, 103001]
+    assert skins[103][1].name == 'Dynasty Ahri'
+    assert skins[103][1].internal_name == 'AhriHanbok'
+
+
+def test_get_skins_for_champion():
+    provider = mock.MagicMock()
+    provider.get_db_select.return_value = iter(MOCK_SKINS[:1])
+
+    skins = list(loldb.skin.get_skins_for_champion(provider, 103))
+
+    kwargs = provider.get_db_select.call_args[1]
+    assert kwargs['where'] == 'championId = ?'
+    assert kwargs['parameters'] == (103,)
+    assert [skin.id for skin in skins] == [103001]
@@ -0,0 +1,72 @@
+import sqlite3
+
+import loldb.ability
+import loldb.champion
+import loldb.convert
+import loldb.item
+import loldb.skin
+import loldb.sqlite
+
+
+def _make_records():
+    champion = loldb.champion.Champion('Ahri')
+    champion.id = 103
+    champion.name = champion.alias = 'Ahri'
+    champion.tags = set(['mage', 'assassin'])
+    champion.stats.hp = loldb.champion.ChampionStat(380, 80)
+    ability = loldb.ability.Ability()
+    ability.name = 'Orb of Deception'
+    for cost in (65, 70):
+        level = loldb.ability.AbilityLevel()
+        level.cost = cost
+        level.tooltip_values['@Effect1Amount@'] = cost + 15
+        level.tooltip_values['@f1@'] = [1, 2]
+        ability.levels.append(level)
+    champion.abilities.append(ability)
+    skin = loldb.skin.Skin('Ahri')
+    skin.id = 103001
+    champion.skins.append(skin)
+
+    item = loldb.item.Item()
+    item.id = 3128
+    item.name = 'Deathfire Grasp'
+    item.categories = set(['active', 'spell_damage'])
+    item.recipe = set([1058, 3108])
+
+    return ([loldb.convert.format_champion(champion)],
+            {item.id: loldb.convert.format_item(item)})
+
+
+def test_write_sqlite(tmpdir):
+    path = str(tmpdir.join('loldb.sqlite'))
+    tmpdir.join('loldb.sqlite').write('old')
+    champions, items = _make_records()
+    loldb.sqlite.write_sqlite(path, champions, items)
+
+    db = sqlite3.connect(path)
+    assert db.execute('SELECT id, tags FROM champions').fetchall() == [
+        (103, 'assassin,mage'),
+    ]
+    assert db.execute(
+        "SELECT base, per_level FROM champion_stats "
+        "WHERE champion_id = 103 AND stat = 'hp'"
+    ).fetchall() == [(380, 80)]
+    assert db.execute(
+        'SELECT level, cost FROM ability_levels JOIN abilities '
+        'ON ability_id = abilities.id WHERE champion_id = 103'
+    ).fetchall() == [(1, 65), (2, 70)]
+    assert db.execute(
+        'SELECT key, value FROM tooltip_values WHERE level = 2'
+    ).fetchall() == [('@Effect1Amount@', 85), ('@f1@', '[1, 2]')]
+    assert db.execute('SELECT champion_id FROM skins').fetchall() == [(103,)]
+    assert db.execute(
+        'SELECT category FROM item_categories WHERE item_id = 3128'
+    ).fetchall() == [('active',), ('spell_damage',)]
+    assert db.execute(
+        'SELECT component_id FROM item_recipes WHERE item_id = 3128'
+    ).fetchall() == [(1058,), (3108,)]
+    assert db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' "
+        "AND name = 'items_alias'"
+    ).fetchone() == (1,)
+    db.close()
@@ -0,0 +1,113 @@
+import io
+
+import pytest
+
+import loldb.champion
+import loldb.convert
+import loldb.item
+import loldb.table
+
+numpy = pytest.importorskip('numpy')
+
+
+def _make_champion(id, hp):
+    champion = loldb.champion.Champion('Champion%d' % id)
+    champion.id = id
+    champion.stats.hp = loldb.champion.ChampionStat(hp, 80)
+    champion.stats.range = 550
+    return champion
+
+
+def test_champion_stat_table():
+    champions = [_make_champion(103, 380), _make_champion(1, 384)]
+    table = loldb.table.ChampionStatTable.from_champions(champions)
+    assert len(table) == 2
+    assert table.ids.tolist() == [1, 103]
+    assert 103 in table and 2 not in table
+    assert table.base.shape == (2, len(loldb.table.STATS))
+
+    base, per_level = table.get_stat('hp')
+    assert base.tolist() == [384, 380]
+    assert per_level.tolist() == [80, 80]
+    base, per_level = table.get_stat('range')
+    assert base.tolist() == [550, 550]
+    assert per_level.tolist() == [0, 0]
+
+    base, _ = table.get_champion(103)
+    assert base[table.get_stat_index('hp')] == 380
+    with pytest.raises(KeyError):
+        table.get_champion(2)
+
+    records = map(loldb.convert.format_champion, champions)
+    from_records = loldb.table.ChampionStatTable.from_records(records)
+    assert (from_records.base == table.base).all()
+
+
+def test_champion_stat_table_save():
+    table = loldb.table.ChampionStatTable.from_champions(
+        [_make_champion(1, 384)]
+    )
+    f = io.BytesIO()
+    table.save(f)
+    f.seek(0)
+    loaded = loldb.table.ChampionStatTable.load(f)
+    assert loaded.ids.tolist() == [1]
+    assert (loaded.per_level == table.per_level).all()
+
+    empty = loldb.table.ChampionStatTable.from_champions([])
+    assert empty.base.shape == (0, len(loldb.table.STATS))
+
+
+def test_champion_stat_table_levels():
+    champion = _make_champion(1, 380)
+    champion.stats.attack_speed = loldb.champion.ChampionStat(0.625, 0.02)
+    table = loldb.table.ChampionStatTable.from_champions([champion])
+
+    values = table.get_stats_at_levels()
+    assert values.shape == (1, loldb.table.MAX_LEVEL, len(table.stats))
+    hp = table.get_stat_index('hp')
+    assert values[0, 0, hp] == 460
+    assert values[0, 17, hp] == 380 + 80 * 18
+    attack_speed = table.get_stat_index('attack_speed')
+    assert values[0, 0, attack_speed] == 0.625
+    assert numpy.isclose(values[0, 10, attack_speed], 0.625 * 1.2)
+    assert (values[0, :, table.get_stat_index('range')] == 550).all()
+
+    f = io.BytesIO()
+    table.save(f, include_levels=True)
+    f.seek(0)
+    data = numpy.load(f)
+    assert data['levels'].tolist() == list(range(1, 19))
+    assert (data['stats_at_levels'] == values).all()
+
+
+def _make_item(id, damage, attack_speed):
+    item = loldb.item.Item()
+    item.id = id
+    item.stats.damage = loldb.item.ItemStat(damage, 0)
+    item.stats.attack_speed = loldb.item.ItemStat(0, attack_speed)
+    return item
+
+
+def test_item_stat_table_builds():
+    items = [_make_item(3006, 0, 0.25), _make_item(1036, 10, 0)]
+    table = loldb.table.ItemStatTable.from_items(items)
+    assert table.ids.tolist() == [1036, 3006]
+
+    builds = table.get_indices([[1036, 1036, 3006], [3006, -1, -1]])
+    assert builds.tolist() == [[0, 0, 1], [1, -1, -1]]
+    with pytest.raises(KeyError):
+        table.get_indices([[1036, 1001]])
+    with pytest.raises(KeyError):
+        table.get_indices([[9999]])
+
+    flat, percentage = table.get_build_stats(builds)
+    damage = table.get_stat_index('damage')
+    attack_speed = table.get_stat_index('attack_speed')
+    assert flat[:, damage].tolist() == [20, 0]
+    assert percentage[:, attack_speed].tolist() == [0.25, 0.25]
+    assert flat.shape == (2, len(loldb.table.ITEM_STATS))
+
+    for builds in ([], numpy.zeros((0, 6), dtype=int)):
+        flat, percentage = table.get_build_stats(builds)
+        assert flat.shape == percentage.shape == (0, len(table.stats))
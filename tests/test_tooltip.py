@@ -0,0 +1,82 @@
+import loldb.ability
+import loldb.tooltip
+from loldb.tooltip import END, START, TEXT
+
+
+def test_tokenize():
+    tokens = list(loldb.tooltip.tokenize(
+        "<mainText>Deals <font color='#FF0000'>50</font> &amp; more<br/>"
+        "Lasts <2 seconds<stats /></MAINTEXT>"
+    ))
+    assert tokens == [
+        (START, 'maintext'),
+        (TEXT, 'Deals '),
+        (START, 'font'),
+        (TEXT, '50'),
+        (END, 'font'),
+        (TEXT, ' & more'),
+        (START, 'br'),
+        (TEXT, 'Lasts <2 seconds'),
+        (START, 'stats'),
+        (END, 'stats'),
+        (END, 'maintext'),
+    ]
+
+
+def test_format_tooltip():
+    format_tooltip = loldb.ability.Ability.format_tooltip
+    assert format_tooltip(
+        '<titleLeft>Orb</titleLeft><mainText>Deals @Effect1Amount@'
+        '<br><br><stats>+10</stats> damage.</mainText><br>Ignored'
+    ) == 'Deals @Effect1Amount@\n\n+10 damage.'
+    assert format_tooltip('<maintext>Unclosed <active>text') == 'Unclosed text'
+    assert format_tooltip('<maintext></maintext>') == ''
+    assert format_tooltip('No maintext') is None
+    assert format_tooltip(
+        '<mainText><stats>Deals<br/>50</stats><active/> damage.</mainText>'
+        'Ignored'
+    ) == 'Deals\n50 damage.'
+    assert format_tooltip('<maintext/>Ignored') == ''
+
+
+def test_tooltip_template():
+    template = loldb.tooltip.TooltipTemplate(
+        'Deals @Effect1Amount@ (+@CharAbilityPower@) damage, '
+        'then @Effect1Amount@ again.@f1@'
+    )
+    assert template.keys == [
+        '@Effect1Amount@',
+        '@CharAbilityPower@',
+        '@Effect1Amount@',
+        '@f1@',
+    ]
+    assert template.render({'@Effect1Amount@': 40, '@f1@': ''}) == (
+        'Deals 40 (+@CharAbilityPower@) damage, then 40 again.'
+    )
+    assert template.get_missing_keys({'@Effect1Amount@': 40}) == set([
+        '@CharAbilityPower@',
+        '@f1@',
+    ])
+    assert loldb.tooltip.TooltipTemplate(None).render({}) == ''
+
+
+def test_ability_tooltips():
+    ability = loldb.ability.Ability()
+    ability.tooltip = 'Deals @Effect1Amount@ (+@CharAbilityPower@) damage.'
+    for amount in (40, 65):
+        level = loldb.ability.AbilityLevel()
+        level.set_tooltip_value('@Effect1Amount@', amount)
+        ability.levels.append(level)
+
+    assert ability.get_tooltips() == [
+        'Deals 40 (+@CharAbilityPower@) damage.',
+        'Deals 65 (+@CharAbilityPower@) damage.',
+    ]
+    assert ability.get_tooltip_for_level(1) == ability.get_tooltips()[1]
+    assert ability.get_missing_tooltip_keys() == [
+        set(['@CharAbilityPower@']),
+    ] * 2
+
+    # Template is recompiled when the tooltip changes
+    ability.tooltip = '@Effect1Amount@'
+    assert ability.get_tooltips() == ['40', '65']